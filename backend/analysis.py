@@ -1,13 +1,33 @@
 # backend/analysis.py
 import math
+import os
 import re
-from typing import Dict
+import time
+from array import array
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Iterable, List
 
 _SENT_SPLIT = re.compile(r"[.!?]+")
 _WORD_SPLIT = re.compile(r"[^\w']+")
+# the tokens _WORD_SPLIT leaves behind, matched directly
+_WORD = re.compile(r"[\w']+")
+# the segments _SENT_SPLIT leaves behind, matched directly
+_SENTENCE = re.compile(r"[^.!?]+")
+# a segment "has content" exactly when str.strip() would leave something
+_NON_SPACE = re.compile(r"\S")
+# paragraphs are separated by blank lines
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
 
 VOWELS = "aeiouy"
 
+# bump whenever tokenization or the formulas change, so cached results
+# computed by an older version are not served
+ALGORITHM_VERSION = "1"
+
+# distinct words kept in the per-process syllable cache (0 disables it)
+SYLLABLE_CACHE_SIZE = int(os.getenv("SYLLABLE_CACHE_SIZE", 50_000))
+
 def _count_syllables(word: str) -> int:
     w = word.lower().strip()
     if not w:
@@ -24,19 +44,63 @@ def _count_syllables(word: str) -> int:
         prev_is_vowel = is_vowel
     return max(count, 1)
 
+class SyllableCache:
+    """
+    Bounded LRU cache of lower-cased word -> syllable count.
+
+    Natural text repeats a small vocabulary, so most lookups are hits. The
+    least recently used word is evicted once ``maxsize`` words are cached.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def count(self, word: str) -> int:
+        key = word.lower()
+        n = self._data.get(key)
+        if n is not None:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return n
+        self.misses += 1
+        n = _count_syllables(key)
+        if self.maxsize > 0:
+            self._data[key] = n
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return n
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+syllable_cache = SyllableCache(SYLLABLE_CACHE_SIZE)
+
+# words counted per step by ReadabilityAccumulator.feed
+_WORD_BATCH = 4096
+
 def _tokenize(text: str):
     sentences = [s.strip() for s in _SENT_SPLIT.split(text) if s.strip()]
     words = [w for w in _WORD_SPLIT.split(text) if w.strip()]
     return sentences, words
 
-def _polysyllable_count(words):
-    return sum(1 for w in words if _count_syllables(w) >= 3)
-
-def readability_scores(text: str) -> Dict[str, float]:
-    sentences, words = _tokenize(text)
-    s_count = max(len(sentences), 1)
-    w_count = max(len(words), 1)
-    syllables = sum(_count_syllables(w) for w in words)
+def _scores(sentences: int, words: int, syllables: int, complex_words: int) -> Dict[str, float]:
+    s_count = max(sentences, 1)
+    w_count = max(words, 1)
 
     words_per_sentence = w_count / s_count
     syllables_per_word = syllables / w_count
@@ -45,7 +109,6 @@ def readability_scores(text: str) -> Dict[str, float]:
     fk_re = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
 
     # Gunning Fog Index
-    complex_words = _polysyllable_count(words)
     gf = 0.4 * (words_per_sentence + 100 * (complex_words / w_count))
 
     # SMOG (approximate for small samples)
@@ -61,3 +124,380 @@ def readability_scores(text: str) -> Dict[str, float]:
         "syllables": syllables,
         "complex_words": complex_words,
     }
+
+
+class ReadabilityAccumulator:
+    """
+    Incremental readability counter.
+
+    Text can be fed in arbitrary chunks; each word is scanned once and
+    sentences and words are matched in place rather than split into lists,
+    so memory stays flat regardless of document or chunk size. ``result()``
+    returns the same dict as ``readability_scores`` on the concatenated text.
+    """
+
+    __slots__ = (
+        "chars", "sentences", "words", "syllables", "complex_words", "_open_sentence", "_tail",
+        "tokenize_seconds", "syllable_seconds", "score_seconds",
+    )
+
+    def __init__(self):
+        self.chars = 0
+        self.sentences = 0
+        self.words = 0
+        self.syllables = 0
+        self.complex_words = 0
+        # the current sentence segment has non-whitespace content
+        self._open_sentence = False
+        # trailing word fragment held back until the next chunk
+        self._tail = ""
+        # time spent per phase; travels with the accumulator out of pool workers
+        self.tokenize_seconds = 0.0
+        self.syllable_seconds = 0.0
+        self.score_seconds = 0.0
+
+    def feed(self, chunk: str) -> "ReadabilityAccumulator":
+        if not chunk:
+            return self
+        self.chars += len(chunk)
+        start = time.perf_counter()
+
+        # sentence segments: the first one continues the open segment,
+        # the last one stays open for the next chunk
+        pos = 0
+        open_sentence = self._open_sentence
+        for m in _SENT_SPLIT.finditer(chunk):
+            if open_sentence or _NON_SPACE.search(chunk, pos, m.start()):
+                self.sentences += 1
+            open_sentence = False
+            pos = m.end()
+        self._open_sentence = open_sentence or _NON_SPACE.search(chunk, pos) is not None
+
+        # words are counted in bounded batches, so timing the two phases
+        # does not need a list of every word in the chunk
+        words = self._words(chunk)
+        self.tokenize_seconds += time.perf_counter() - start
+        while True:
+            start = time.perf_counter()
+            batch = list(islice(words, _WORD_BATCH))
+            counted = time.perf_counter()
+            self._count_words(batch)
+            self.tokenize_seconds += counted - start
+            self.syllable_seconds += time.perf_counter() - counted
+            if len(batch) < _WORD_BATCH:
+                return self
+
+    def _words(self, chunk: str):
+        """
+        Words of `chunk`. A word running into the end of the chunk is held
+        back in ``_tail`` and joined with the start of the next chunk, so
+        words split across chunks are counted once.
+        """
+        end = len(chunk)
+        pos = 0
+        if self._tail:
+            head = _WORD.match(chunk)
+            if head:
+                self._tail += head.group()
+                pos = head.end()
+            if pos == end:
+                return
+            yield self._tail
+            self._tail = ""
+        for m in _WORD.finditer(chunk, pos):
+            if m.end() == end:
+                self._tail = m.group()
+            else:
+                yield m.group()
+
+    def _count_words(self, words):
+        count = syllable_cache.count
+        syllables = 0
+        complex_words = 0
+        for w in words:
+            n = count(w)
+            syllables += n
+            if n >= 3:
+                complex_words += 1
+        self.words += len(words)
+        self.syllables += syllables
+        self.complex_words += complex_words
+
+    def counts(self):
+        """(sentences, words, syllables, complex_words) so far, without closing the stream."""
+        sentences = self.sentences + (1 if self._open_sentence else 0)
+        words, syllables, complex_words = self.words, self.syllables, self.complex_words
+        if self._tail:
+            n = syllable_cache.count(self._tail)
+            words += 1
+            syllables += n
+            complex_words += 1 if n >= 3 else 0
+        return sentences, words, syllables, complex_words
+
+    def result(self) -> Dict[str, float]:
+        start = time.perf_counter()
+        scores = _scores(*self.counts())
+        self.score_seconds += time.perf_counter() - start
+        return scores
+
+    def phase_seconds(self) -> Dict[str, float]:
+        return {
+            "tokenize": self.tokenize_seconds,
+            "syllables": self.syllable_seconds,
+            "score": self.score_seconds,
+        }
+
+
+def readability_scores(text: str) -> Dict[str, float]:
+    return ReadabilityAccumulator().feed(text).result()
+
+def _add_phases(total: Dict[str, float], acc: ReadabilityAccumulator):
+    for phase, seconds in acc.phase_seconds().items():
+        total[phase] = total.get(phase, 0.0) + seconds
+
+
+
+# ---------------- INCREMENTAL RE-ANALYSIS ----------------
+
+def _paragraph_state(paragraph: str, phases: Dict[str, float]):
+    """
+    (sentences, words, syllables, complex_words, first_open, last_open) for one
+    paragraph. first_open / last_open tell whether its first or last sentence
+    has no terminator on that side and so continues into the neighbouring
+    paragraph. Time spent is added to `phases`.
+    """
+    acc = ReadabilityAccumulator().feed(paragraph)
+    _add_phases(phases, acc)
+    head = _SENTENCE.match(paragraph)
+    first_open = bool(head and head.group().strip())
+    return (*acc.counts(), first_open, acc._open_sentence)
+
+class IncrementalReadability:
+    """
+    Readability handle for a document that is edited and re-scored repeatedly.
+
+    Counts are cached per paragraph text. ``update()`` only counts paragraphs it
+    has not seen before and re-aggregates the cached totals, so the cost of a
+    re-analysis follows the size of the edit rather than of the document.
+    The aggregate is exactly ``readability_scores`` of the full text.
+    """
+
+    def __init__(self):
+        self._paragraphs = {}
+        # paragraphs counted by the last update() and the time it took per phase
+        self.recounted = 0
+        self.phase_seconds = {}
+
+    def update(self, text: str) -> Dict[str, float]:
+        states = []
+        cache = {}
+        recounted = 0
+        phases = {}
+        for paragraph in _PARAGRAPH_SPLIT.split(text):
+            if not paragraph.strip():
+                continue
+            state = cache.get(paragraph) or self._paragraphs.get(paragraph)
+            if state is None:
+                state = _paragraph_state(paragraph, phases)
+                recounted += 1
+            cache[paragraph] = state
+            states.append(state)
+        # paragraphs that were edited away are dropped here
+        self._paragraphs = cache
+        self.recounted = recounted
+
+        start = time.perf_counter()
+        sentences = sum(s[0] for s in states)
+        # a sentence left open at the end of one paragraph and continued at the
+        # start of the next was counted twice
+        sentences -= sum(1 for a, b in zip(states, states[1:]) if a[5] and b[4])
+        scores = _scores(
+            sentences,
+            sum(s[1] for s in states),
+            sum(s[2] for s in states),
+            sum(s[3] for s in states),
+        )
+        phases["score"] = phases.get("score", 0.0) + time.perf_counter() - start
+        self.phase_seconds = phases
+        return scores
+
+    def uncounted_chars(self, text: str) -> int:
+        """Size of the paragraphs of `text` that ``update()`` would have to count."""
+        return sum(len(p) for p in _PARAGRAPH_SPLIT.split(text) if p not in self._paragraphs)
+
+def update_incremental(handle: IncrementalReadability, text: str):
+    """Process-pool friendly update(): returns the handle along with the scores."""
+    return handle, handle.update(text)
+
+
+def readability_level(flesch_kincaid_re: float) -> str:
+    """Coarse level derived from Flesch Reading Ease."""
+    if flesch_kincaid_re >= 70:
+        return "Beginner"
+    if flesch_kincaid_re >= 50:
+        return "Intermediate"
+    return "Advanced"
+
+def score_documents(texts: List[str]) -> List[Dict]:
+    """
+    Scores several documents, one result per text: the scores plus ``level``,
+    or ``{"error": ...}`` when the text cannot be scored.
+    """
+    return score_documents_timed(texts)[0]
+
+def score_documents_timed(texts: List[str]):
+    """score_documents() along with the time spent per phase over all texts."""
+    results = []
+    phases = {}
+    for text in texts:
+        if not text or not text.strip():
+            results.append({"error": "Empty text"})
+            continue
+        acc = ReadabilityAccumulator().feed(text)
+        scores = acc.result()
+        _add_phases(phases, acc)
+        scores["level"] = readability_level(scores["flesch_kincaid_re"])
+        results.append(scores)
+    return results, phases
+
+
+# ---------------- CORPUS SCORING ----------------
+# numpy/pandas are only needed here, so they are imported on first use
+# instead of slowing down every API worker's startup
+
+def _round2(values):
+    """
+    Rounds an array to 2 decimals exactly like the built-in round().
+    np.round is used where it provably agrees; values within a hair of a
+    rounding tie are handed to round() itself.
+    """
+    import numpy as np
+
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(float(v), 2) for v in values[ties]]
+    return rounded
+
+def _score_arrays(sentences, words, syllables, complex_words):
+    """Vectorized _scores over integer NumPy arrays of per-document counts."""
+    import numpy as np
+
+    s_count = np.maximum(sentences, 1)
+    w_count = np.maximum(words, 1)
+
+    words_per_sentence = w_count / s_count
+    syllables_per_word = syllables / w_count
+
+    fk_re = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+    gf = 0.4 * (words_per_sentence + 100 * (complex_words / w_count))
+    poly = np.maximum(complex_words, 1)
+    smog = 1.0430 * np.sqrt(poly * (30.0 / s_count)) + 3.1291
+
+    fk_re = _round2(fk_re)
+    return {
+        "flesch_kincaid_re": fk_re,
+        "gunning_fog": _round2(gf),
+        "smog": _round2(smog),
+        "sentences": s_count,
+        "words": w_count,
+        "syllables": syllables,
+        "complex_words": complex_words,
+        "level": np.select([fk_re >= 70, fk_re >= 50], ["Beginner", "Intermediate"], "Advanced"),
+    }
+
+def corpus_scores(texts: Iterable[str]):
+    """
+    Scores many documents at once and returns a pandas DataFrame with one row
+    per document and the ``readability_scores`` columns plus ``level``.
+
+    Per-document counts are packed into a flat integer buffer and the formulas
+    run once over whole NumPy columns, so no per-document dicts are built and
+    the values match ``readability_scores`` exactly.
+    """
+    import numpy as np
+    import pandas as pd
+
+    counts = array("q")
+    for text in texts:
+        counts.extend(ReadabilityAccumulator().feed(text).counts())
+    columns = np.frombuffer(counts, dtype=np.int64).reshape(-1, 4).T
+    return pd.DataFrame(_score_arrays(*columns))
+
+
+# ---------------- READABILITY PROFILE ----------------
+
+def _sentence_counts(text: str):
+    """Per-sentence word, syllable and complex-word counts as int64 arrays."""
+    import numpy as np
+
+    count = syllable_cache.count
+    words, syllables, complex_words = array("q"), array("q"), array("q")
+    for m in _SENTENCE.finditer(text):
+        segment = m.group()
+        if not segment.strip():
+            continue
+        w = s = c = 0
+        for word in _WORD.findall(segment):
+            n = count(word)
+            w += 1
+            s += n
+            if n >= 3:
+                c += 1
+        words.append(w)
+        syllables.append(s)
+        complex_words.append(c)
+    return tuple(np.frombuffer(a, dtype=np.int64) for a in (words, syllables, complex_words))
+
+def _paragraph_counts(text: str):
+    """Per-paragraph (sentences, words, syllables, complex_words), each paragraph scored on its own."""
+    import numpy as np
+
+    counts = array("q")
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        if paragraph.strip():
+            counts.extend(ReadabilityAccumulator().feed(paragraph).counts())
+    return np.frombuffer(counts, dtype=np.int64).reshape(-1, 4).T
+
+def _compact(scores, keys=("flesch_kincaid_re", "gunning_fog", "smog", "level")):
+    return {k: scores[k].tolist() for k in keys}
+
+def readability_profile(text: str, window: int = 5, step: int = 1) -> Dict:
+    """
+    Flesch, Fog and SMOG for every window of ``window`` consecutive sentences
+    (advancing by ``step``) and for every paragraph.
+
+    Window totals come from prefix sums of per-sentence counts, so the whole
+    profile costs O(document) regardless of the window size. Results are
+    column arrays rather than per-window dicts to keep long profiles small.
+    Paragraphs are scored independently, so a sentence running across a
+    paragraph break counts in both.
+    """
+    import numpy as np
+
+    words, syllables, complex_words = _sentence_counts(text)
+    n = len(words)
+    zero = np.zeros(1, dtype=np.int64)
+    prefix = [np.concatenate((zero, np.cumsum(a))) for a in (words, syllables, complex_words)]
+
+    starts = np.arange(0, max(n - window, 0) + 1, step) if n else np.zeros(0, dtype=np.int64)
+    ends = np.minimum(starts + window, n)
+    windows = _score_arrays(ends - starts, *(p[ends] - p[starts] for p in prefix))
+
+    paragraphs = _score_arrays(*_paragraph_counts(text))
+
+    return {
+        "sentences": n,
+        "window": window,
+        "step": step,
+        "windows": {"start": starts.tolist(), **_compact(windows)},
+        "paragraphs": {"sentences": paragraphs["sentences"].tolist(), **_compact(paragraphs)},
+    }
+
+
+if __name__ == "__main__":
+    # python -m backend.analysis scan DIR ...
+    from .scan import main
+
+    main()
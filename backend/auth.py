@@ -1,16 +1,33 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import time
+from typing import Optional, Tuple
+from . import config  # noqa: F401  (loads .env)
+from . import metrics
+from .workers import BoundedProcessPool, default_pool_size
 
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+# changing the cost rehashes each user's password on their next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# bcrypt runs in its own processes so a login burst cannot starve other endpoints
+# (per API worker process, see workers.default_pool_size)
+AUTH_POOL_WORKERS = int(os.getenv("AUTH_POOL_WORKERS", default_pool_size()))
+AUTH_POOL_MAX_PENDING = int(os.getenv("AUTH_POOL_MAX_PENDING", 4 * AUTH_POOL_WORKERS))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def warm_up() -> str:
+    """Loads and self-tests the bcrypt backend, which passlib otherwise does on the first hash."""
+    return pwd_context.handler().get_backend()
+
+# every worker process warms up as it starts
+hash_pool = BoundedProcessPool(AUTH_POOL_WORKERS, AUTH_POOL_MAX_PENDING, initializer=warm_up)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -18,8 +35,41 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+def verify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Verifies a password and returns a new hash if the stored one uses outdated settings."""
+    return pwd_context.verify_and_update(plain, hashed)
+
+def _timed(fn, *args):
+    # timed where it runs, so pool queueing is not counted as bcrypt time
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+async def _run(operation: str, fn, *args):
+    # raises workers.PoolUnavailable when the pool is full or a worker died
+    if hash_pool.enabled:
+        result, seconds = await hash_pool.run(_timed, fn, *args)
+    else:
+        result, seconds = await run_in_threadpool(_timed, fn, *args)
+    metrics.auth_bcrypt.observe(seconds, operation)
+    return result
+
+async def hash_password(password: str) -> str:
+    return await _run("hash", get_password_hash, password)
+
+async def check_password(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return await _run("verify", verify_and_update, plain, hashed)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Returns the token's claims, or None if it is invalid or expired."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload if payload.get("sub") else None
@@ -0,0 +1,210 @@
+"""
+Bulk user/profile import and export.
+
+    python -m backend.bulk import users.csv [--batch-size 1000] [--workers N]
+    python -m backend.bulk export users.jsonl [--include-hashes]
+
+Files are CSV or JSON Lines, picked by extension (or --format). Import rows
+need ``name``, ``email`` and either ``password`` or an already computed
+``password_hash`` (in a format the API's CryptContext accepts, i.e. bcrypt).
+Rows with any of ``age_group``, ``language_pref`` or ``bio`` also get a
+profile (named ``profile_name``, defaulting to ``name``); the profile fields
+a row leaves out are stored empty.
+Passwords are hashed in parallel across cores and every batch is inserted
+with executemany in one transaction. Emails already in the database or seen
+earlier in the file are skipped and reported.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import insert, select
+
+from . import auth, database, models
+
+PROFILE_FIELDS = ("age_group", "language_pref", "bio")
+EXPORT_FIELDS = ["id", "name", "email", "created_at", "profile_name", *PROFILE_FIELDS, "profile_pic"]
+
+
+def _format(path: str, fmt: str = None) -> str:
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def _read_records(f, fmt: str):
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+    else:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _batches(records, size: int):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportReport:
+    def __init__(self):
+        self.users = 0
+        self.profiles = 0
+        self.duplicates = []
+        self.invalid = []
+
+    def summary(self) -> str:
+        return (
+            f"Imported {self.users} user(s) and {self.profiles} profile(s); "
+            f"skipped {len(self.duplicates)} duplicate and {len(self.invalid)} invalid row(s)"
+        )
+
+
+def import_users(db, records, pool, batch_size: int = 1000) -> ImportReport:
+    report = ImportReport()
+    seen = set()
+    row_number = 0
+    for batch in _batches(records, batch_size):
+        # validate and drop in-file duplicates
+        rows = []
+        for record in batch:
+            row_number += 1
+            email = (record.get("email") or "").strip()
+            if not email or not record.get("name") or not (record.get("password") or record.get("password_hash")):
+                report.invalid.append(row_number)
+                continue
+            # a hash passlib cannot identify would make every login for the user fail
+            if record.get("password_hash") and not auth.pwd_context.identify(record["password_hash"], required=False):
+                report.invalid.append(row_number)
+                continue
+            if email in seen:
+                report.duplicates.append(email)
+                continue
+            seen.add(email)
+            rows.append((email, record))
+
+        # drop emails that are already registered
+        emails = [email for email, _ in rows]
+        existing = set(db.scalars(select(models.User.email).where(models.User.email.in_(emails))))
+        report.duplicates.extend(email for email in emails if email in existing)
+        rows = [(email, record) for email, record in rows if email not in existing]
+        if not rows:
+            continue
+
+        to_hash = [record["password"] for _, record in rows if not record.get("password_hash")]
+        hashes = iter(pool.map(auth.get_password_hash, to_hash, chunksize=max(len(to_hash) // 64, 1)))
+        users = [
+            {
+                "name": record.get("name"),
+                "email": email,
+                "password_hash": record.get("password_hash") or next(hashes),
+            }
+            for email, record in rows
+        ]
+        db.execute(insert(models.User), users)
+
+        ids = dict(db.execute(
+            select(models.User.email, models.User.id).where(models.User.email.in_([u["email"] for u in users]))
+        ).all())
+        profiles = [
+            {
+                "user_id": ids[email],
+                "name": record.get("profile_name") or record.get("name"),
+                # the API requires every profile field, so missing ones are stored empty
+                **{field: record.get(field) or "" for field in PROFILE_FIELDS},
+            }
+            for email, record in rows
+            if any(record.get(field) for field in PROFILE_FIELDS)
+        ]
+        if profiles:
+            db.execute(insert(models.Profile), profiles)
+        db.commit()
+        report.users += len(users)
+        report.profiles += len(profiles)
+    return report
+
+
+def export_users(db, f, fmt: str, include_hashes: bool = False) -> int:
+    """Streams every user with their profile to `f`; returns the row count."""
+    fields = EXPORT_FIELDS + (["password_hash"] if include_hashes else [])
+    columns = [
+        models.User.id,
+        models.User.name,
+        models.User.email,
+        models.User.created_at,
+        models.Profile.name.label("profile_name"),
+        *(getattr(models.Profile, field) for field in PROFILE_FIELDS),
+        models.Profile.profile_pic,
+    ]
+    if include_hashes:
+        columns.append(models.User.password_hash)
+    query = (
+        select(*columns)
+        .outerjoin(models.Profile, models.Profile.user_id == models.User.id)
+        .order_by(models.User.id)
+        .execution_options(yield_per=1000)
+    )
+
+    writer = csv.DictWriter(f, fieldnames=fields) if fmt == "csv" else None
+    if writer:
+        writer.writeheader()
+    count = 0
+    for row in db.execute(query):
+        record = dict(zip(fields, row))
+        record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+        if writer:
+            writer.writerow(record)
+        else:
+            f.write(json.dumps(record) + "\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.bulk")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imp = commands.add_parser("import", help="import users and profiles")
+    imp.add_argument("path", help="CSV or JSONL file, - for stdin")
+    imp.add_argument("--format", choices=["csv", "jsonl"])
+    imp.add_argument("--batch-size", type=int, default=1000)
+    imp.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="password hashing processes")
+
+    exp = commands.add_parser("export", help="export users and profiles")
+    exp.add_argument("path", help="CSV or JSONL file, - for stdout")
+    exp.add_argument("--format", choices=["csv", "jsonl"])
+    exp.add_argument("--include-hashes", action="store_true", help="include password hashes")
+
+    args = parser.parse_args(argv)
+    fmt = _format(args.path, args.format)
+    db = database.SessionLocal()
+    try:
+        if args.command == "import":
+            f = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+            ctx = multiprocessing.get_context("spawn")
+            with f, ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx) as pool:
+                report = import_users(db, _read_records(f, fmt), pool, args.batch_size)
+            print(report.summary())
+            if report.invalid:
+                print(f"Invalid rows: {', '.join(map(str, report.invalid[:20]))}", file=sys.stderr)
+        else:
+            f = sys.stdout if args.path == "-" else open(args.path, "w", newline="", encoding="utf-8")
+            with f:
+                count = export_users(db, f, fmt, args.include_hashes)
+            print(f"Exported {count} user(s)", file=sys.stderr)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from . import database, models
+from .analysis import ALGORITHM_VERSION, syllable_cache
+
+# ---------------- GENERIC CACHE ----------------
+_registry: Dict[str, "TTLCache"] = {}
+
+class TTLCache:
+    """
+    In-memory LRU cache whose entries also expire after ``ttl`` seconds.
+    Instances register themselves by name so their counters show up in
+    ``cache_stats()``.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        _registry[name] = self
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires = entry
+            if expires > time.monotonic():
+                self.hits += 1
+                self._data.move_to_end(key)
+                return value
+            del self._data[key]
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        entry = self._data.pop(key, None)
+        return entry[0] if entry else None
+
+    def clear(self):
+        self._data.clear()
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    stats = {name: cache.info() for name, cache in _registry.items()}
+    stats["syllables"] = syllable_cache.info()
+    return stats
+
+# ---------------- READABILITY RESULTS ----------------
+READABILITY_CACHE_SIZE = int(os.getenv("READABILITY_CACHE_SIZE", 1024))
+READABILITY_CACHE_TTL = int(os.getenv("READABILITY_CACHE_TTL", 24 * 3600))
+# persistent tier in the readability_cache table, off unless enabled
+READABILITY_CACHE_DB = os.getenv("READABILITY_CACHE_DB", "0") == "1"
+READABILITY_CACHE_DB_MAX_ROWS = int(os.getenv("READABILITY_CACHE_DB_MAX_ROWS", 100_000))
+# prune expired / excess rows once every this many inserts
+_PRUNE_EVERY = 100
+
+class TextFingerprint:
+    """
+    Streaming SHA-256 of a text with whitespace runs collapsed to one space
+    and leading/trailing whitespace dropped, prefixed with the algorithm
+    version. Whitespace only ever acts as a separator in the analysis, so
+    texts with equal fingerprints have equal scores.
+    """
+
+    def __init__(self, version: str = ALGORITHM_VERSION):
+        self._hash = hashlib.sha256(f"readability:{version}\n".encode())
+        self.has_content = False
+        # whitespace seen since the last emitted character
+        self._space = False
+
+    def update(self, chunk: str):
+        if not chunk:
+            return
+        parts = chunk.split()
+        if not parts:
+            self._space = True
+            return
+        if self.has_content and (self._space or chunk[0].isspace()):
+            self._hash.update(b" ")
+        self._hash.update(" ".join(parts).encode("utf-8", "surrogatepass"))
+        self.has_content = True
+        self._space = chunk[-1].isspace()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+readability_results = TTLCache("readability", READABILITY_CACHE_SIZE, READABILITY_CACHE_TTL)
+_db_inserts = 0
+
+def get_readability(key: str) -> Optional[dict]:
+    """Memory tier lookup; cheap enough to call from the event loop."""
+    result = readability_results.get(key)
+    return dict(result) if result is not None else None
+
+def put_readability(key: str, result: dict):
+    readability_results.set(key, dict(result))
+
+def load_readability(key: str) -> Optional[dict]:
+    """Database tier lookup (blocking). Hits are promoted to the memory tier."""
+    db = database.SessionLocal()
+    try:
+        row = db.get(models.ReadabilityCacheEntry, key)
+        if row is None or row.created_at < datetime.utcnow() - timedelta(seconds=READABILITY_CACHE_TTL):
+            return None
+        result = json.loads(row.result)
+    finally:
+        db.close()
+    put_readability(key, result)
+    return result
+
+def store_readability(key: str, result: dict):
+    """Writes a result to the database tier (blocking), pruning it now and then."""
+    global _db_inserts
+    db = database.SessionLocal()
+    try:
+        db.merge(models.ReadabilityCacheEntry(
+            key=key,
+            algorithm_version=ALGORITHM_VERSION,
+            result=json.dumps(result),
+            created_at=datetime.utcnow(),
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            # a concurrent miss on the same text inserted the key first; the
+            # stored result is the same one
+            db.rollback()
+            return
+        _db_inserts += 1
+        if _db_inserts % _PRUNE_EVERY == 0:
+            prune_readability(db)
+    finally:
+        db.close()
+
+def prune_readability(db):
+    """Drops expired rows, then the oldest rows beyond READABILITY_CACHE_DB_MAX_ROWS."""
+    table = models.ReadabilityCacheEntry
+    cutoff = datetime.utcnow() - timedelta(seconds=READABILITY_CACHE_TTL)
+    db.query(table).filter(table.created_at < cutoff).delete(synchronize_session=False)
+    first_dropped = (
+        db.query(table.created_at)
+        .order_by(table.created_at.desc())
+        .offset(READABILITY_CACHE_DB_MAX_ROWS)
+        .limit(1)
+        .scalar()
+    )
+    if first_dropped is not None:
+        db.query(table).filter(table.created_at <= first_dropped).delete(synchronize_session=False)
+    db.commit()
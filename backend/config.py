@@ -0,0 +1,7 @@
+"""
+Loads the .env file into the environment. Imported before any other backend
+module so settings read at import time (e.g. in analysis or storage) see it.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
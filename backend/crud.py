@@ -1,3 +1,4 @@
+from sqlalchemy import exc, update
 from sqlalchemy.orm import Session
 from . import models, schemas
 from .auth import get_password_hash
@@ -6,17 +7,35 @@ from datetime import datetime
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
-def create_user(db: Session, user: schemas.UserCreate):
+def get_profile(db: Session, user_id: int):
+    return db.query(models.Profile).filter(models.Profile.user_id == user_id).first()
+
+def set_profile_pic_variants(db: Session, user_id: int, profile_pic: str, variants: dict):
+    """Records derivative URLs, unless the picture was replaced in the meantime."""
+    updated = (
+        db.query(models.Profile)
+        .filter(models.Profile.user_id == user_id, models.Profile.profile_pic == profile_pic)
+        .update({"profile_pic_variants": variants})
+    )
+    db.commit()
+    return updated
+
+def create_user(db: Session, user: schemas.UserCreate, password_hash: str = None):
+    # callers on the event loop hash the password elsewhere and pass it in
     db_user = models.User(
         name=user.name,
         email=user.email,
-        password_hash=get_password_hash(user.password),
+        password_hash=password_hash or get_password_hash(user.password),
     )
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
+def update_password_hash(db: Session, user_id: int, password_hash: str):
+    db.query(models.User).filter(models.User.id == user_id).update({"password_hash": password_hash})
+    db.commit()
+
 def create_profile(db: Session, user_id: int, profile: schemas.ProfileCreate):
     db_profile = models.Profile(**profile.dict(), user_id=user_id)
     db.add(db_profile)
@@ -33,7 +52,10 @@ def update_profile(db: Session, user_id: int, profile: schemas.ProfileCreate):
         db_profile.age_group = profile.age_group
         db_profile.language_pref = profile.language_pref
         db_profile.bio = profile.bio
-        db_profile.profile_pic = profile.profile_pic
+        if profile.profile_pic:
+            # keep the current picture unless a new one was uploaded
+            db_profile.profile_pic = profile.profile_pic
+            db_profile.profile_pic_variants = None  # regenerated for the new picture
         db_profile.updated_at = datetime.utcnow()
     else:
         # create new profile
@@ -50,3 +72,66 @@ def update_profile(db: Session, user_id: int, profile: schemas.ProfileCreate):
     db.commit()
     db.refresh(db_profile)
     return db_profile
+
+# ---------------- ANALYSIS HISTORY ----------------
+_LEVEL_COLUMNS = {
+    "Beginner": "beginner_count",
+    "Intermediate": "intermediate_count",
+    "Advanced": "advanced_count",
+}
+
+def record_analysis(db: Session, user_id: int, text_key: str, scores: dict):
+    """Saves an analysis and folds it into the user's summary in one transaction."""
+    db.add(models.AnalysisRecord(
+        user_id=user_id,
+        text_key=text_key,
+        **{k: scores[k] for k in (
+            "flesch_kincaid_re", "gunning_fog", "smog",
+            "sentences", "words", "syllables", "complex_words", "level",
+        )},
+    ))
+    table = models.AnalysisSummary
+    level_column = _LEVEL_COLUMNS[scores["level"]]
+    increments = {
+        "count": table.count + 1,
+        "flesch_kincaid_re_sum": table.flesch_kincaid_re_sum + scores["flesch_kincaid_re"],
+        "gunning_fog_sum": table.gunning_fog_sum + scores["gunning_fog"],
+        "smog_sum": table.smog_sum + scores["smog"],
+        level_column: getattr(table, level_column) + 1,
+        "updated_at": datetime.utcnow(),
+    }
+    # the UPDATE is atomic in the database, so concurrent analyses never lose a count
+    for _ in range(2):
+        updated = db.execute(
+            update(table).where(table.user_id == user_id).values(**increments)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated:
+            break
+        # first analysis of this user: create the row, unless a concurrent one just did
+        try:
+            level_counts = {column: 0 for column in _LEVEL_COLUMNS.values()}
+            level_counts[level_column] = 1
+            with db.begin_nested():
+                db.add(table(
+                    user_id=user_id,
+                    count=1,
+                    flesch_kincaid_re_sum=scores["flesch_kincaid_re"],
+                    gunning_fog_sum=scores["gunning_fog"],
+                    smog_sum=scores["smog"],
+                    **level_counts,
+                ))
+            break
+        except exc.IntegrityError:
+            continue
+    db.commit()
+
+def get_analysis_history(db: Session, user_id: int, limit: int, before: int = None):
+    """Newest-first page of a user's analyses with ids below `before`."""
+    query = db.query(models.AnalysisRecord).filter(models.AnalysisRecord.user_id == user_id)
+    if before is not None:
+        query = query.filter(models.AnalysisRecord.id < before)
+    return query.order_by(models.AnalysisRecord.id.desc()).limit(limit).all()
+
+def get_analysis_summary(db: Session, user_id: int):
+    return db.get(models.AnalysisSummary, user_id)
@@ -1,19 +1,267 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from starlette.concurrency import run_in_threadpool
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import time
+from . import config  # noqa: F401  (loads .env)
 
 MYSQL_USER = os.getenv("MYSQL_USER", "root1")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "root123!")
 MYSQL_DB = os.getenv("MYSQL_DB", "auth_demo")
 MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
 
-DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}"
+# DATABASE_URL replaces the MySQL settings above, e.g. sqlite:///./textmorph.db
+# for a single-node deployment without a database server
+DATABASE_URL = os.getenv("DATABASE_URL") or (
+    f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}"
+)
+_url = make_url(DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+# an in-memory database lives in a single connection (tests only: every process gets its own)
+SQLITE_MEMORY = IS_SQLITE and (
+    _url.database in (None, "", ":memory:") or _url.query.get("mode") == "memory"
+)
+
+# DB_ASYNC=1 serves requests from an async engine (aiomysql/aiosqlite) so a
+# request waiting on the database does not hold a threadpool thread
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+# connection pool tuning
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+# MySQL closes idle connections after wait_timeout, so recycle before that
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# connections opened at startup so the first requests do not pay for the
+# MySQL handshake (capped at DB_POOL_SIZE, the connections the pool keeps)
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", DB_POOL_SIZE))
+
+# SQLite tuning, applied to every new connection. WAL lets readers run
+# alongside the single writer; synchronous=NORMAL is durable in WAL mode
+# except for the last transactions before a power loss.
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+# page cache per connection; negative values are KiB
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64 * 1024))
+# how long a writer waits for the write lock before "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+_WRITES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "SAVEPOINT")
+
+
+class PoolStats:
+    """Checkout counters for one connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+def _timed_pool(base, stats: PoolStats):
+    """Pool class that records how long each checkout waited for a connection."""
+
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                stats.timeouts += 1
+                raise
+            finally:
+                stats.record(time.perf_counter() - start)
+
+    return TimedPool
+
+
+def _pool_args(base, stats: PoolStats) -> dict:
+    if SQLITE_MEMORY:
+        # every session has to share the one connection holding the database
+        return {"poolclass": _timed_pool(StaticPool, stats), "connect_args": {"check_same_thread": False}}
+    args = {
+        "poolclass": _timed_pool(base, stats),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if IS_SQLITE:
+        # connections move between threadpool threads
+        args["connect_args"] = {"check_same_thread": False}
+    return args
+
+
+def _async_url(url: str) -> str:
+    driver, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(driver, driver)}://{rest}"
+
+
+def _configure_sqlite(engine):
+    """
+    Applies the pragmas to each new connection and, for database files,
+    serializes writers.
+
+    The driver's own transaction handling is turned off and every
+    transaction starts as a plain (deferred) BEGIN, so reads never wait. The
+    first write of a transaction that has only read so far commits that
+    read transaction and starts over with BEGIN IMMEDIATE, which takes the
+    write lock up front and waits up to SQLITE_BUSY_TIMEOUT_MS for it.
+    Upgrading the read transaction in place instead fails straight away with
+    "database is locked" if another writer committed since it started,
+    which is common when a request reads, awaits bcrypt and then writes.
+    """
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        if not SQLITE_MEMORY:
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in (
+            "journal_mode=WAL",
+            f"synchronous={SQLITE_SYNCHRONOUS}",
+            f"mmap_size={SQLITE_MMAP_SIZE}",
+            f"cache_size={SQLITE_CACHE_SIZE}",
+            f"busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+            # enforced like on MySQL
+            "foreign_keys=ON",
+        ):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
 
-engine = create_engine(DATABASE_URL)
+    if SQLITE_MEMORY:
+        # sessions share the one connection, so they cannot each BEGIN on it;
+        # the driver's implicit transactions are left in place
+        return
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN")
+        conn.info["sqlite_writing"] = False
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get("sqlite_writing", True) or not statement.lstrip()[:9].upper().startswith(_WRITES):
+            return
+        conn.info["sqlite_writing"] = True
+        cursor.execute("COMMIT")
+        cursor.execute("BEGIN IMMEDIATE")
+
+
+sync_pool_stats = PoolStats()
+engine = create_engine(DATABASE_URL, **_pool_args(QueuePool, sync_pool_stats))
+if IS_SQLITE:
+    _configure_sqlite(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_pool_stats = PoolStats()
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    async_engine = create_async_engine(
+        _async_url(DATABASE_URL), **_pool_args(AsyncAdaptedQueuePool, async_pool_stats)
+    )
+    if IS_SQLITE:
+        _configure_sqlite(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 Base = declarative_base()
+
+
+class DB:
+    """
+    Session handle that endpoints get from ``get_db``.
+
+    ORM code stays written against a plain ``Session`` and is called through
+    ``run``: on the async engine it runs on the event loop via
+    ``AsyncSession.run_sync``, on the sync engine it runs in the threadpool.
+    Anything that lazy-loads relationships must happen inside ``run``.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def close(self):
+        if isinstance(self.session, AsyncSession):
+            await self.session.close()
+        else:
+            await run_in_threadpool(self.session.close)
+
+
+def _describe(pool, stats: PoolStats) -> dict:
+    occupancy = {}
+    if isinstance(pool, QueuePool):
+        occupancy = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+    return {
+        **occupancy,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_seconds_total": round(stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(stats.wait_seconds_max, 6),
+    }
+
+
+# connections a pool keeps open
+_POOLED_CONNECTIONS = 1 if SQLITE_MEMORY else DB_POOL_SIZE
+
+
+def warm_pool(count: int = DB_POOL_WARMUP) -> int:
+    """Opens up to `count` connections at once and returns them to the pool."""
+    connections = []
+    try:
+        for _ in range(min(count, _POOLED_CONNECTIONS)):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+
+async def warm_async_pool(count: int = DB_POOL_WARMUP) -> int:
+    connections = []
+    try:
+        for _ in range(min(count, _POOLED_CONNECTIONS)):
+            conn = await async_engine.connect()
+            connections.append(conn)
+            await conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in connections:
+            await conn.close()
+    return len(connections)
+
+
+def pool_stats() -> dict:
+    """Occupancy and checkout wait times of the connection pools."""
+    stats = {"sync": _describe(engine.pool, sync_pool_stats)}
+    if async_engine is not None:
+        stats["async"] = _describe(async_engine.sync_engine.pool, async_pool_stats)
+    return stats
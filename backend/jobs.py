@@ -0,0 +1,295 @@
+"""
+Persistent queue of readability jobs, stored in the readability_jobs table.
+
+Workers claim a job with a conditional UPDATE that only one of them can win,
+so any number of worker processes (on any number of hosts) can share the
+queue without double-processing. A claim is a lease: a worker that dies
+mid-job lets its lease expire and the job is picked up again, until it has
+had READABILITY_JOB_MAX_ATTEMPTS attempts and is marked failed. Idle workers
+back off exponentially between polls. A finished job keeps its result or
+error but not its document, which is cleared once the job is done or failed.
+
+The API starts READABILITY_JOB_WORKERS worker processes from its lifespan;
+more can be run separately with:
+
+    python -m backend.jobs worker [--workers N]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import secrets
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from . import database, models
+from .analysis import ReadabilityAccumulator, readability_level
+
+JOB_WORKERS = int(os.getenv("READABILITY_JOB_WORKERS", 1))
+JOB_LEASE_SECONDS = int(os.getenv("READABILITY_JOB_LEASE_SECONDS", 300))
+JOB_MAX_ATTEMPTS = int(os.getenv("READABILITY_JOB_MAX_ATTEMPTS", 3))
+# idle polling starts at the minimum and doubles up to the maximum
+JOB_POLL_MIN = float(os.getenv("READABILITY_JOB_POLL_MIN", 0.2))
+JOB_POLL_MAX = float(os.getenv("READABILITY_JOB_POLL_MAX", 5.0))
+# documents are scored in chunks of this many characters, renewing the lease in between
+JOB_CHUNK_CHARS = 1_000_000
+# claim candidates fetched per poll, so racing workers do not all chase the same row
+_CLAIM_CANDIDATES = 8
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+# ---------------- QUEUE ----------------
+def enqueue(db: Session, text: str) -> str:
+    job = models.ReadabilityJob(id=secrets.token_hex(16), status=QUEUED, text=text)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def get_job(db: Session, job_id: str) -> Optional[dict]:
+    """Job status without the document itself."""
+    table = models.ReadabilityJob
+    row = db.execute(
+        select(
+            table.status, table.result, table.error, table.attempts,
+            table.created_at, table.started_at, table.finished_at,
+        ).where(table.id == job_id)
+    ).first()
+    if row is None:
+        return None
+    job = {
+        "job_id": job_id,
+        "status": row.status,
+        "attempts": row.attempts,
+        "created_at": row.created_at,
+        "started_at": row.started_at,
+        "finished_at": row.finished_at,
+    }
+    if row.status == DONE:
+        job["result"] = json.loads(row.result)
+    elif row.status == FAILED:
+        job["error"] = row.error
+    return job
+
+
+def _claimable(now: datetime):
+    table = models.ReadabilityJob
+    return or_(
+        table.status == QUEUED,
+        and_(table.status == RUNNING, table.lease_expires < now),
+    )
+
+
+def claim(db: Session, owner: str) -> Optional[str]:
+    """
+    Takes the oldest available job for `owner` and returns its id, or None.
+    Candidates are read without locks; the UPDATE re-checks availability,
+    so exactly one worker sees rowcount 1 for a given job. An expired job
+    that has used up its attempts is marked failed instead of claimed.
+    """
+    table = models.ReadabilityJob
+    now = datetime.utcnow()
+    candidates = db.execute(
+        select(table.id, table.attempts).where(_claimable(now)).order_by(table.created_at).limit(_CLAIM_CANDIDATES)
+    ).all()
+    # end the read transaction, or its snapshot (REPEATABLE READ on MySQL,
+    # WAL on SQLite) would hide jobs enqueued after the first poll
+    db.commit()
+    # racing workers start at different candidates
+    random.shuffle(candidates)
+    for job_id, attempts in candidates:
+        if attempts >= JOB_MAX_ATTEMPTS:
+            _abandon(db, job_id, now)
+            continue
+        claimed = db.execute(
+            update(table)
+            .where(table.id == job_id, _claimable(now), table.attempts < JOB_MAX_ATTEMPTS)
+            .values(
+                status=RUNNING,
+                lease_owner=owner,
+                lease_expires=now + timedelta(seconds=JOB_LEASE_SECONDS),
+                attempts=table.attempts + 1,
+                started_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return job_id
+    return None
+
+
+def _abandon(db: Session, job_id: str, now: datetime):
+    """
+    Fails a job whose lease ran out on its last attempt. Its worker died
+    mid-job (e.g. OOM-killed on a huge document) every time, so fail() never
+    ran for it.
+    """
+    table = models.ReadabilityJob
+    db.execute(
+        update(table)
+        .where(table.id == job_id, table.status == RUNNING, table.lease_expires < now)
+        .values(
+            status=FAILED,
+            error=f"Worker lost the job on each of {JOB_MAX_ATTEMPTS} attempts",
+            text="",
+            lease_owner=None,
+            lease_expires=None,
+            finished_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _finish(db: Session, job_id: str, owner: str, **values) -> bool:
+    """Updates a job only while `owner` still holds its lease."""
+    table = models.ReadabilityJob
+    updated = db.execute(
+        update(table)
+        .where(table.id == job_id, table.lease_owner == owner)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(updated)
+
+
+def renew(db: Session, job_id: str, owner: str) -> bool:
+    return _finish(db, job_id, owner, lease_expires=datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS))
+
+
+def complete(db: Session, job_id: str, owner: str, result: dict) -> bool:
+    return _finish(
+        db, job_id, owner,
+        status=DONE, result=json.dumps(result), text="", lease_owner=None, lease_expires=None,
+        finished_at=datetime.utcnow(),
+    )
+
+
+def fail(db: Session, job_id: str, owner: str, error: str, attempts: int) -> bool:
+    """Puts the job back in the queue, or marks it failed after JOB_MAX_ATTEMPTS."""
+    if attempts < JOB_MAX_ATTEMPTS:
+        return _finish(db, job_id, owner, status=QUEUED, error=error, lease_owner=None, lease_expires=None)
+    return _finish(
+        db, job_id, owner,
+        status=FAILED, error=error, text="", lease_owner=None, lease_expires=None,
+        finished_at=datetime.utcnow(),
+    )
+
+
+# ---------------- WORKER ----------------
+def process(db: Session, job_id: str, owner: str) -> bool:
+    """Scores a claimed job. Returns False if the lease was lost on the way."""
+    job = db.get(models.ReadabilityJob, job_id)
+    text, attempts = job.text, job.attempts
+    # the document can be large; do not keep it in the identity map
+    db.expunge(job)
+    if not text or text.isspace():
+        return fail(db, job_id, owner, "Empty text", JOB_MAX_ATTEMPTS)
+    try:
+        acc = ReadabilityAccumulator()
+        renew_at = time.monotonic() + JOB_LEASE_SECONDS / 3
+        for start in range(0, len(text), JOB_CHUNK_CHARS):
+            acc.feed(text[start:start + JOB_CHUNK_CHARS])
+            if time.monotonic() > renew_at:
+                if not renew(db, job_id, owner):
+                    return False
+                renew_at = time.monotonic() + JOB_LEASE_SECONDS / 3
+        scores = acc.result()
+        scores["level"] = readability_level(scores["flesch_kincaid_re"])
+    except Exception:
+        db.rollback()
+        return fail(db, job_id, owner, traceback.format_exc(limit=5), attempts)
+    return complete(db, job_id, owner, scores)
+
+
+def run_worker(stop=None, owner: Optional[str] = None):
+    """
+    Claims and processes jobs until `stop` (a multiprocessing.Event) is set.
+    Polling backs off from JOB_POLL_MIN to JOB_POLL_MAX while the queue is empty.
+    """
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+    stop = stop or multiprocessing.Event()
+    delay = JOB_POLL_MIN
+    db = database.SessionLocal()
+    try:
+        while not stop.is_set():
+            try:
+                job_id = claim(db, owner)
+            except Exception:
+                # database unavailable: keep backing off rather than exiting
+                db.rollback()
+                job_id = None
+            if job_id is not None:
+                try:
+                    process(db, job_id, owner)
+                except Exception:
+                    # the lease runs out and the job is retried elsewhere
+                    db.rollback()
+                delay = JOB_POLL_MIN
+                continue
+            # jitter keeps idle workers from polling in lockstep
+            stop.wait(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, JOB_POLL_MAX)
+    finally:
+        db.close()
+
+
+class WorkerGroup:
+    """Job worker processes owned by the API process (see the lifespan in main)."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        # spawn, not fork: the server process has threads and open DB connections
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._processes = []
+
+    def start(self):
+        for _ in range(self.workers):
+            p = self._ctx.Process(target=run_worker, args=(self._stop,), daemon=True)
+            p.start()
+            self._processes.append(p)
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        for p in self._processes:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self._processes = []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker = commands.add_parser("worker", help="process queued readability jobs")
+    worker.add_argument("--workers", type=int, default=1, help="worker processes")
+    args = parser.parse_args(argv)
+
+    if args.workers <= 1:
+        try:
+            run_worker()
+        except KeyboardInterrupt:
+            pass
+        return
+    group = WorkerGroup(args.workers)
+    group.start()
+    try:
+        for p in group._processes:
+            p.join()
+    except KeyboardInterrupt:
+        group.stop()
+
+
+if __name__ == "__main__":
+    main()
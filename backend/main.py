@@ -1,30 +1,280 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
-from fastapi.staticfiles import StaticFiles
+import time
+
+# the startup report in /ready counts from here, so it includes the imports below
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from fastapi.security import OAuth2PasswordBearer
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
+from starlette.responses import StreamingResponse
 from sqlalchemy.orm import Session
+import asyncio
+import codecs
+import json
+import logging
 import os
-from datetime import datetime
-from .analysis import readability_scores
+import secrets
+from typing import Optional
+from . import config  # noqa: F401  (loads .env before the modules below read settings)
+from .analysis import (
+    IncrementalReadability,
+    ReadabilityAccumulator,
+    readability_level,
+    readability_profile,
+    score_documents_timed,
+    update_incremental,
+)
+from .cache import (
+    READABILITY_CACHE_DB,
+    TextFingerprint,
+    TTLCache,
+    cache_stats,
+    get_readability,
+    load_readability,
+    put_readability,
+    store_readability,
+)
+from .storage import (
+    UPLOAD_DIR,
+    CachedStaticFiles,
+    UnsupportedImage,
+    UploadTooLarge,
+    generate_derivatives,
+    store_image,
+)
+from .workers import API_WORKERS, BoundedProcessPool, PoolUnavailable, default_pool_size
 
 
-from . import database, schemas, crud, auth, models
+from . import database, schemas, crud, auth, jobs, metrics
 
-app = FastAPI()
+# ---------------- READABILITY SETUP ----------------
+# uploads are read and decoded in chunks of this size
+READ_CHUNK_SIZE = int(os.getenv("READABILITY_CHUNK_SIZE", 64 * 1024))
+# larger .txt uploads are rejected with 413
+MAX_UPLOAD_BYTES = int(os.getenv("READABILITY_MAX_UPLOAD_BYTES", 50 * 1024 * 1024))
+# documents up to this many characters are scored on the event loop,
+# anything larger goes to the process pool (0 workers disables the pool)
+INLINE_MAX_CHARS = int(os.getenv("READABILITY_INLINE_MAX_CHARS", 100_000))
+# scoring processes per API worker process (see workers.default_pool_size)
+POOL_WORKERS = int(os.getenv("READABILITY_POOL_WORKERS", default_pool_size()))
+POOL_MAX_PENDING = int(os.getenv("READABILITY_POOL_MAX_PENDING", 2 * POOL_WORKERS))
+# maximum number of documents in one /readability/batch request
+BATCH_MAX_ITEMS = int(os.getenv("READABILITY_BATCH_MAX_ITEMS", 1000))
+# maximum size of a whole /readability/batch request (JSON body, or all files and fields)
+BATCH_MAX_BYTES = int(os.getenv("READABILITY_BATCH_MAX_BYTES", MAX_UPLOAD_BYTES))
 
-# ---------------- FILE UPLOAD SETUP ----------------
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# incremental analysis handles kept per editing session. They live in this
+# process only: with several API workers (uvicorn --workers N, or replicas)
+# the load balancer must route a session's requests to the same worker
+# (sticky routing, e.g. hashing on the session id in the URL). Otherwise an
+# update that lands on another worker gets 404 and the client has to open a
+# new session, recounting the whole document.
+SESSION_MAX = int(os.getenv("READABILITY_SESSION_MAX", 256))
+SESSION_TTL = int(os.getenv("READABILITY_SESSION_TTL", 3600))
+
+scoring_pool = BoundedProcessPool(POOL_WORKERS, POOL_MAX_PENDING)
+analysis_sessions = TTLCache("analysis_sessions", SESSION_MAX, SESSION_TTL)
+
+# ---------------- TOKEN CACHE SETUP ----------------
+# The token and profile caches are per process and invalidated only in the
+# process that handled the change, so with several API workers
+# (WEB_CONCURRENCY) the others can serve a stale user or profile until the
+# entry expires. Their default TTLs drop to a few seconds in that case.
+_CACHE_TTL = 300 if API_WORKERS == 1 else 5
+
+# verified tokens are mapped to their user for this long, so repeat requests
+# from a client skip the user query
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", _CACHE_TTL))
+
+token_cache = TTLCache("tokens", TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+# read-through cache of ProfileOut by user id; POST/DELETE /profile drop entries
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", 10_000))
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", _CACHE_TTL))
+
+profile_cache = TTLCache("profiles", PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL)
+
+# ---------------- STARTUP ----------------
+# seconds between attempts to reach the database during warm-up
+WARMUP_RETRY_SECONDS = int(os.getenv("WARMUP_RETRY_SECONDS", 5))
+
+logger = logging.getLogger("uvicorn.error")
+
+# timings of the import and warm-up phases, served by /ready
+startup_report = {"ready": False}
+# warm-up calls running in threads, which cancelling warm-up cannot stop
+_warm_up_threads = set()
+
+async def _warm_db():
+    while True:
+        start = time.perf_counter()
+        try:
+            connections = await run_in_threadpool(database.warm_pool)
+            if database.async_engine is not None:
+                connections = await database.warm_async_pool()
+        except Exception as e:
+            # database unavailable: stay unready and try again
+            startup_report["db_error"] = str(e)
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+            continue
+        startup_report.pop("db_error", None)
+        startup_report["db_connections"] = connections
+        startup_report["db_seconds"] = round(time.perf_counter() - start, 3)
+        return
+
+async def _warm_pools():
+    start = time.perf_counter()
+    # bcrypt in this process serves logins when the hash pool is disabled.
+    # The self-test runs inside the Rust backend and cannot be interrupted;
+    # the lifespan waits for it, since exiting while it runs aborts the process
+    self_test = asyncio.ensure_future(run_in_threadpool(auth.warm_up))
+    _warm_up_threads.add(self_test)
+    self_test.add_done_callback(_warm_up_threads.discard)
+    await asyncio.shield(self_test)
+    try:
+        await asyncio.gather(auth.hash_pool.start(), scoring_pool.start())
+    except PoolUnavailable:
+        # a worker died while starting; the pools start again on first use
+        pass
+    startup_report["pools_seconds"] = round(time.perf_counter() - start, 3)
+
+async def warm_up():
+    """
+    Opens pooled DB connections and starts the bcrypt and scoring worker
+    processes, so the first requests a new server takes are not slowed down
+    by connection handshakes, process spawns or passlib's backend loading.
+    """
+    start = time.perf_counter()
+    await asyncio.gather(_warm_db(), _warm_pools())
+    startup_report["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    startup_report["ready_seconds"] = round(time.perf_counter() - _import_started, 3)
+    startup_report["ready"] = True
+    logger.info("Ready: %s", json.dumps(startup_report))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_report["import_seconds"] = round(time.perf_counter() - _import_started, 3)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    job_workers = jobs.WorkerGroup(jobs.JOB_WORKERS)
+    job_workers.start()
+    # runs while the server already accepts requests; /ready reports when it is done
+    warm_up_task = asyncio.create_task(warm_up())
+    yield
+    warm_up_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up_task
+    await asyncio.gather(*_warm_up_threads, return_exceptions=True)
+    await run_in_threadpool(job_workers.stop)
+    scoring_pool.shutdown()
+    auth.hash_pool.shutdown()
 
-# Serve uploads folder as static files
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app = FastAPI(lifespan=lifespan)
+
+# ---------------- METRICS SETUP ----------------
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engine(database.engine)
+    if database.async_engine is not None:
+        metrics.instrument_engine(database.async_engine.sync_engine)
+
+# ---------------- FILE UPLOAD SETUP ----------------
+# Serve uploads folder as static files, with long-lived caching for stored images
+# (the folder is created by the lifespan, not on import)
+app.mount("/uploads", CachedStaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")
 
 # ---------------- DB DEPENDENCY ----------------
-def get_db():
-    db = database.SessionLocal()
+async def get_db():
+    if database.AsyncSessionLocal is not None:
+        db = database.DB(database.AsyncSessionLocal())
+    else:
+        db = database.DB(database.SessionLocal())
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+# ---------------- CURRENT USER ----------------
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+# for endpoints that also serve anonymous callers
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
+
+# bumped whenever a user or their profile changes; cached tokens resolved
+# under an older generation are treated as misses
+_user_generation = {}
+
+def invalidate_user(email: str):
+    _user_generation[email] = _user_generation.get(email, 0) + 1
+
+# bumped by every profile write; a profile read from the database is only
+# cached if no write finished while the read was in flight, so a slow read
+# cannot put back an entry that a concurrent POST/DELETE just dropped
+_profile_writes = 0
+
+def invalidate_profile(user_id: int):
+    global _profile_writes
+    _profile_writes += 1
+    profile_cache.pop(user_id)
+
+def _cache_profile(user_id: int, profile, writes: int):
+    if _profile_writes == writes:
+        profile_cache.set(user_id, profile)
+
+def _user_and_profile(db: Session, email: str):
+    user = crud.get_user_by_email(db, email)
+    if user is None:
+        return None
+    profile = schemas.ProfileOut.model_validate(user.profile) if user.profile else None
+    return schemas.CurrentUser.model_validate(user), profile
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: database.DB = Depends(get_db),
+) -> schemas.CurrentUser:
+    unauthorized = HTTPException(
+        status_code=401,
+        detail="Invalid or expired token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    cached = token_cache.get(token)
+    if cached is not None:
+        user, generation = cached
+        if _user_generation.get(user.email, 0) == generation:
+            return user
+
+    claims = auth.decode_access_token(token)
+    if claims is None:
+        raise unauthorized
+    email = claims["sub"]
+    generation = _user_generation.get(email, 0)
+    profile_writes = _profile_writes
+    user = await db.run(_user_and_profile, email)
+    if user is None:
+        raise unauthorized
+    user, profile = user
+    if profile is not None:
+        # the profile came with the same joined query, so prime its cache
+        _cache_profile(user.id, profile, profile_writes)
+    # never cache a token past its own expiry
+    ttl = min(TOKEN_CACHE_TTL, claims["exp"] - time.time())
+    token_cache.set(token, (user, generation), ttl=ttl)
+    return user
+
+async def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: database.DB = Depends(get_db),
+) -> Optional[schemas.CurrentUser]:
+    """The authenticated user, or None without an Authorization header."""
+    if token is None:
+        return None
+    return await get_current_user(token, db)
+
+def _check_owner(current_user: schemas.CurrentUser, email: str):
+    if email is not None and email != current_user.email:
+        raise HTTPException(status_code=403, detail="Not allowed to access another user's profile")
 
 # ---------------- ROOT ----------------
 @app.get("/")
@@ -34,122 +284,632 @@ def root():
         "endpoints": ["/register", "/login", "/profile", "/docs", "/redoc"]
     }
 
+@app.get("/metrics")
+def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/ready")
+def ready(response: Response):
+    """200 once the warm-up has finished, 503 before; the body is the startup report."""
+    if not startup_report["ready"]:
+        response.status_code = 503
+    return startup_report
+
+@app.get("/db/pool")
+def get_pool_stats():
+    return database.pool_stats()
+
 # ---------------- AUTH ----------------
+def _auth_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many sign-ins in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @app.post("/register", response_model=schemas.UserOut)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, user.email)
+async def register(user: schemas.UserCreate, db: database.DB = Depends(get_db)):
+    db_user = await db.run(crud.get_user_by_email, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db, user)
+    try:
+        password_hash = await auth.hash_password(user.password)
+    except PoolUnavailable:
+        raise _auth_busy()
+    return await db.run(
+        lambda s: schemas.UserOut.model_validate(crud.create_user(s, user, password_hash))
+    )
 
 @app.post("/login")
-def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, request.email)
-    if not user or not auth.verify_password(request.password, user.password_hash):
+async def login(request: schemas.LoginRequest, db: database.DB = Depends(get_db)):
+    user = await db.run(crud.get_user_by_email, request.email)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await auth.check_password(request.password, user.password_hash)
+    except PoolUnavailable:
+        raise _auth_busy()
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # the hash was made with older CryptContext settings
+        await db.run(crud.update_password_hash, user.id, new_hash)
+        invalidate_user(user.email)
     token = auth.create_access_token({"sub": user.email})
     return {"access_token": token, "token_type": "bearer"}
 
 # ---------------- PROFILE ----------------
+def _store_derivatives(user_id: int, rel_path: str, base_url: str):
+    """Background task: builds thumbnails for a new picture and records their URLs."""
+    derivatives = generate_derivatives(rel_path)
+    if not derivatives:
+        return
+    variants = {name: f"{base_url}uploads/{path}" for name, path in derivatives.items()}
+    db = database.SessionLocal()
+    try:
+        crud.set_profile_pic_variants(db, user_id, f"{base_url}uploads/{rel_path}", variants)
+    finally:
+        db.close()
+    invalidate_profile(user_id)
+
 @app.post("/profile", response_model=schemas.ProfileOut)
-def create_or_update_profile(
+async def create_or_update_profile(
     request: Request,
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     age_group: str = Form(...),
     language_pref: str = Form(...),
     bio: str = Form(...),
-    email: str = Form(...),
+    email: str = Form(None),
     profile_pic: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    db: database.DB = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user),
 ):
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    _check_owner(user, email)
 
     # Handle file upload
     file_url = None
     if profile_pic:
-        file_path = os.path.join(UPLOAD_DIR, profile_pic.filename)
-        with open(file_path, "wb") as f:
-            f.write(profile_pic.file.read())
+        try:
+            rel_path = await run_in_threadpool(store_image, profile_pic.file, profile_pic.filename)
+        except UnsupportedImage:
+            raise HTTPException(status_code=415, detail="Profile picture must be a JPEG, PNG, GIF or WebP image")
+        except UploadTooLarge:
+            raise HTTPException(status_code=413, detail="Profile picture is too large")
         # Save public URL
-        file_url = f"{request.base_url}uploads/{profile_pic.filename}"
-
-    # Fetch or create profile
-    profile = db.query(models.Profile).filter(models.Profile.user_id == user.id).first()
-
-    if profile:
-        # Update profile
-        profile.name = name
-        profile.age_group = age_group
-        profile.language_pref = language_pref
-        profile.bio = bio
-        if file_url:
-            profile.profile_pic = file_url
-        profile.updated_at = datetime.utcnow()
-    else:
-        # Create new profile
-        profile = models.Profile(
-            name=name,
-            age_group=age_group,
-            language_pref=language_pref,
-            bio=bio,
-            profile_pic=file_url,
-            user_id=user.id
-        )
-        db.add(profile)
-
-    db.commit()
-    db.refresh(profile)
-    return profile
+        file_url = f"{request.base_url}uploads/{rel_path}"
+
+    profile = schemas.ProfileCreate(
+        name=name,
+        age_group=age_group,
+        language_pref=language_pref,
+        bio=bio,
+        profile_pic=file_url,
+    )
+    saved = await db.run(
+        lambda s: schemas.ProfileOut.model_validate(crud.update_profile(s, user.id, profile))
+    )
+    invalidate_profile(user.id)
+    invalidate_user(user.email)
+    if file_url:
+        # thumbnails are made after the response is sent
+        background_tasks.add_task(_store_derivatives, user.id, rel_path, str(request.base_url))
+    return saved
+
+def _profile_out(db: Session, user_id: int):
+    profile = crud.get_profile(db, user_id)
+    return schemas.ProfileOut.model_validate(profile) if profile else None
 
 @app.get("/profile/{email}", response_model=schemas.ProfileOut)
-def get_profile(email: str, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email)
-    if not user or not user.profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    return user.profile
+async def get_profile(
+    email: str,
+    db: database.DB = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user),
+):
+    _check_owner(user, email)
+    profile = profile_cache.get(user.id)
+    if profile is None:
+        profile_writes = _profile_writes
+        profile = await db.run(_profile_out, user.id)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        _cache_profile(user.id, profile, profile_writes)
+    return profile
 
 @app.delete("/profile/{email}")
-def delete_profile(email: str, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email)
-    if not user or not user.profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
+async def delete_profile(
+    email: str,
+    db: database.DB = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user),
+):
+    _check_owner(user, email)
 
-    # delete profile
-    db.delete(user.profile)
-    db.commit()
+    def delete(db: Session):
+        profile = crud.get_profile(db, user.id)
+        if not profile:
+            return False
+        db.delete(profile)
+        db.commit()
+        return True
+
+    deleted = await db.run(delete)
+    invalidate_profile(user.id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    invalidate_user(user.email)
     return {"message": "Profile deleted successfully"}
 
+async def _read_text_chunks(file: UploadFile):
+    """
+    Yields decoded text from an upload chunk by chunk, so only one chunk is
+    held in memory at a time. UTF-8 sequences split across chunk boundaries
+    are reassembled by the incremental decoder.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    size = 0
+    while True:
+        data = await file.read(READ_CHUNK_SIZE)
+        if not data:
+            break
+        size += len(data)
+        if size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES} bytes")
+        yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+def _pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Readability workers are busy, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+async def _offload(size: int, fn, *args):
+    """
+    Runs a scoring function inline for small inputs, or in the process pool
+    once `size` passes INLINE_MAX_CHARS so the event loop stays free.
+    """
+    if not scoring_pool.enabled or size <= INLINE_MAX_CHARS:
+        return fn(*args)
+    try:
+        return await scoring_pool.run(fn, *args)
+    except PoolUnavailable:
+        raise _pool_busy()
+
+async def _feed(acc: ReadabilityAccumulator, chunk: str) -> ReadabilityAccumulator:
+    """Feeds a chunk into the accumulator, in the pool once the document is large."""
+    return await _offload(acc.chars + len(chunk), ReadabilityAccumulator.feed, acc, chunk)
+
+async def _read_text(text: str, file: UploadFile) -> str:
+    if not text and not file:
+        raise HTTPException(status_code=400, detail="Provide 'text' or upload a .txt file")
+    if file:
+        if not file.filename.lower().endswith(".txt"):
+            raise HTTPException(status_code=415, detail="Only .txt files are supported for now")
+        text = "".join([chunk async for chunk in _read_text_chunks(file)])
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Empty text")
+    return text
+
+def _record_analysis(user_id: int, key: str, scores: dict):
+    """Background task: adds an analysis to the user's history and summary."""
+    db = database.SessionLocal()
+    try:
+        crud.record_analysis(db, user_id, key, scores)
+    finally:
+        db.close()
+
 @app.post("/readability")
 async def analyze_readability(
+    response: Response,
+    background_tasks: BackgroundTasks,
     text: str = Form(None),
     file: UploadFile = File(None),
+    user: Optional[schemas.CurrentUser] = Depends(get_optional_user),
 ):
     """
-    Accepts raw text (preferred) or a small .txt file and returns readability metrics.
+    Accepts raw text or a .txt file and returns readability metrics.
+    Uploads are streamed into the analysis instead of being read whole.
+    Results are cached by a fingerprint of the normalized text; the
+    X-Cache header reports HIT or MISS. With a bearer token the analysis
+    is also saved to the user's history, after the response is sent.
     """
     if not text and not file:
         raise HTTPException(status_code=400, detail="Provide 'text' or upload a .txt file")
 
+    fingerprint = TextFingerprint()
     if file:
         if not file.filename.lower().endswith(".txt"):
             raise HTTPException(status_code=415, detail="Only .txt files are supported for now")
-        content = (await file.read()).decode("utf-8", errors="ignore")
+        # hashing pass: much cheaper than scoring, and skips it on a hit
+        async for chunk in _read_text_chunks(file):
+            fingerprint.update(chunk)
     else:
-        content = text
+        fingerprint.update(text)
 
-    if not content.strip():
+    if not fingerprint.has_content:
         raise HTTPException(status_code=400, detail="Empty text")
 
-    scores = readability_scores(content)
-    # derive a coarse level from Flesch Reading Ease
-    fk = scores["flesch_kincaid_re"]
-    if fk >= 70:
-        level = "Beginner"
-    elif fk >= 50:
-        level = "Intermediate"
+    key = fingerprint.hexdigest()
+    scores, tier = get_readability(key), "memory"
+    if scores is None and READABILITY_CACHE_DB:
+        scores, tier = await run_in_threadpool(load_readability, key), "db"
+    if scores is not None:
+        response.headers["X-Cache"] = "HIT"
+        response.headers["X-Cache-Tier"] = tier
+        if user is not None:
+            background_tasks.add_task(_record_analysis, user.id, key, scores)
+        return scores
+
+    acc = ReadabilityAccumulator()
+    if file:
+        await file.seek(0)
+        async for chunk in _read_text_chunks(file):
+            acc = await _feed(acc, chunk)
     else:
-        level = "Advanced"
-    scores["level"] = level
+        acc = await _feed(acc, text)
+
+    scores = acc.result()
+    metrics.observe_analysis(acc.phase_seconds())
+    # derive a coarse level from Flesch Reading Ease
+    scores["level"] = readability_level(scores["flesch_kincaid_re"])
+    put_readability(key, scores)
+    if READABILITY_CACHE_DB:
+        # after the response: the miss should not also wait for a DB write
+        background_tasks.add_task(store_readability, key, scores)
+    if user is not None:
+        background_tasks.add_task(_record_analysis, user.id, key, scores)
+    response.headers["X-Cache"] = "MISS"
     return scores
+
+@app.post("/readability/profile")
+async def analyze_readability_profile(
+    text: str = Form(None),
+    file: UploadFile = File(None),
+    window: int = Form(5, ge=1),
+    step: int = Form(1, ge=1),
+):
+    """
+    Readability over sliding windows of `window` sentences and per paragraph,
+    returned as compact column arrays for charting.
+    """
+    content = await _read_text(text, file)
+    return await _offload(len(content), readability_profile, content, window, step)
+
+async def _stream_events(
+    text: str,
+    file: UploadFile,
+    background_tasks: BackgroundTasks,
+    user_id: Optional[int] = None,
+):
+    """
+    Yields NDJSON progress events while feeding the document, then the result.
+    Starlette cancels this generator when the client disconnects, so
+    abandoned analyses stop at the next chunk. Finished analyses are saved to
+    the history of `user_id`, if given. `background_tasks` run once the
+    response has been sent.
+    """
+    def event(kind: str, **fields) -> str:
+        return json.dumps({"event": kind, **fields}) + "\n"
+
+    fingerprint = TextFingerprint()
+    acc = ReadabilityAccumulator()
+    if not file:
+        # pasted text is already in memory, so a cached result can be sent at once
+        fingerprint.update(text)
+        scores = get_readability(fingerprint.hexdigest()) if fingerprint.has_content else None
+        if scores is not None:
+            if user_id is not None:
+                await run_in_threadpool(_record_analysis, user_id, fingerprint.hexdigest(), scores)
+            yield event("result", **scores)
+            return
+
+    try:
+        if file:
+            async for chunk in _read_text_chunks(file):
+                if not chunk:
+                    continue
+                fingerprint.update(chunk)
+                acc = await _feed(acc, chunk)
+                yield event("progress", done=file.file.tell(), total=file.size, chars=acc.chars, **acc.result())
+        else:
+            for i in range(0, len(text), READ_CHUNK_SIZE):
+                acc = await _feed(acc, text[i:i + READ_CHUNK_SIZE])
+                yield event("progress", done=acc.chars, total=len(text), chars=acc.chars, **acc.result())
+                # let a disconnect cancel us between chunks scored inline
+                await asyncio.sleep(0)
+    except HTTPException as e:
+        yield event("error", status=e.status_code, detail=e.detail)
+        return
+
+    if not fingerprint.has_content:
+        yield event("error", status=400, detail="Empty text")
+        return
+    scores = acc.result()
+    metrics.observe_analysis(acc.phase_seconds())
+    scores["level"] = readability_level(scores["flesch_kincaid_re"])
+    key = fingerprint.hexdigest()
+    put_readability(key, scores)
+    if READABILITY_CACHE_DB:
+        background_tasks.add_task(store_readability, key, scores)
+    if user_id is not None:
+        await run_in_threadpool(_record_analysis, user_id, key, scores)
+    yield event("result", **scores)
+
+async def _closing(events, form):
+    try:
+        async for line in events:
+            yield line
+    finally:
+        await form.close()
+
+@app.post("/readability/stream")
+async def analyze_readability_stream(
+    request: Request,
+    user: Optional[schemas.CurrentUser] = Depends(get_optional_user),
+):
+    """
+    Streaming variant of /readability: newline-delimited JSON with a
+    ``progress`` event per chunk (input units done/total, running counts and
+    partial scores), then a ``result`` event with the final scores, or an
+    ``error`` event if the input turns out to be unusable mid-stream.
+
+    Takes the same ``text`` / ``file`` form fields. The form is parsed here
+    rather than declared as parameters, because FastAPI closes declared
+    uploads before a streaming body is sent.
+    """
+    form = await request.form()
+    text, file = form.get("text"), form.get("file")
+    if not isinstance(file, StarletteUploadFile):
+        file = None
+    if not text and not file:
+        await form.close()
+        raise HTTPException(status_code=400, detail="Provide 'text' or upload a .txt file")
+    if file and not file.filename.lower().endswith(".txt"):
+        await form.close()
+        raise HTTPException(status_code=415, detail="Only .txt files are supported for now")
+    background_tasks = BackgroundTasks()
+    events = _stream_events(None if file else text, file, background_tasks, user.id if user else None)
+    return StreamingResponse(
+        _closing(events, form), media_type="application/x-ndjson", background=background_tasks
+    )
+
+async def _update_session(
+    session_id: str,
+    handle: IncrementalReadability,
+    text: str,
+    user: Optional[schemas.CurrentUser],
+    background_tasks: BackgroundTasks,
+):
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Empty text")
+    # only paragraphs the handle has not seen are counted, so small edits stay
+    # inline while a first analysis or a large rewrite goes to the pool
+    handle, scores = await _offload(handle.uncounted_chars(text), update_incremental, handle, text)
+    metrics.observe_analysis(handle.phase_seconds)
+    analysis_sessions.set(session_id, handle)
+    scores["level"] = readability_level(scores["flesch_kincaid_re"])
+    if user is not None:
+        fingerprint = TextFingerprint()
+        fingerprint.update(text)
+        background_tasks.add_task(_record_analysis, user.id, fingerprint.hexdigest(), dict(scores))
+    return {"session_id": session_id, "paragraphs_recounted": handle.recounted, **scores}
+
+@app.post("/readability/sessions")
+async def create_analysis_session(
+    background_tasks: BackgroundTasks,
+    text: str = Form(""),
+    user: Optional[schemas.CurrentUser] = Depends(get_optional_user),
+):
+    """
+    Opens an incremental analysis handle for a document that will be edited.
+    Send later versions of the text to PUT /readability/sessions/{session_id};
+    only paragraphs that changed are re-counted. The handle is held by this
+    worker process, so multi-worker deployments need sticky routing; a 404
+    from PUT means the session is gone and a new one has to be opened.
+    With a bearer token each analyzed version is saved to the user's history.
+    """
+    return await _update_session(
+        secrets.token_urlsafe(16), IncrementalReadability(), text, user, background_tasks
+    )
+
+@app.put("/readability/sessions/{session_id}")
+async def update_analysis_session(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    text: str = Form(""),
+    user: Optional[schemas.CurrentUser] = Depends(get_optional_user),
+):
+    handle = analysis_sessions.get(session_id)
+    if handle is None:
+        raise HTTPException(status_code=404, detail="Analysis session not found or expired")
+    return await _update_session(session_id, handle, text, user, background_tasks)
+
+@app.delete("/readability/sessions/{session_id}")
+def delete_analysis_session(session_id: str):
+    if analysis_sessions.pop(session_id) is None:
+        raise HTTPException(status_code=404, detail="Analysis session not found or expired")
+    return {"message": "Analysis session closed"}
+
+@app.post("/readability/jobs", status_code=202)
+async def create_readability_job(
+    response: Response,
+    text: str = Form(None),
+    file: UploadFile = File(None),
+    db: database.DB = Depends(get_db),
+):
+    """
+    Queues a document for scoring by the job workers and returns at once.
+    Poll GET /readability/jobs/{job_id} for the result.
+    """
+    content = await _read_text(text, file)
+    job_id = await db.run(jobs.enqueue, content)
+    response.headers["Location"] = f"/readability/jobs/{job_id}"
+    return {"job_id": job_id, "status": jobs.QUEUED}
+
+@app.get("/readability/jobs/{job_id}")
+async def get_readability_job(job_id: str, response: Response, db: database.DB = Depends(get_db)):
+    job = await db.run(jobs.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in (jobs.QUEUED, jobs.RUNNING):
+        response.headers["Retry-After"] = "1"
+    return job
+
+def _split_batch(texts, groups):
+    """Splits texts into `groups` lists of similar total size, remembering original positions."""
+    buckets = [([], [], 0) for _ in range(groups)]
+    for i in sorted(range(len(texts)), key=lambda i: -len(texts[i])):
+        k = min(range(groups), key=lambda k: buckets[k][2])
+        idx, items, size = buckets[k]
+        idx.append(i)
+        items.append(texts[i])
+        buckets[k] = (idx, items, size + len(texts[i]))
+    return [(idx, items) for idx, items, _ in buckets if items]
+
+async def _score_batch(texts):
+    if not scoring_pool.enabled or sum(len(t) for t in texts) <= INLINE_MAX_CHARS:
+        results, phases = score_documents_timed(texts)
+        metrics.observe_analysis(phases)
+        return results
+    groups = _split_batch(texts, min(scoring_pool.workers, len(texts)))
+    try:
+        group_results = await scoring_pool.map(score_documents_timed, [items for _, items in groups])
+    except PoolUnavailable:
+        raise _pool_busy()
+    results = [None] * len(texts)
+    phases = {}
+    for (idx, _), (scored, group_phases) in zip(groups, group_results):
+        for i, r in zip(idx, scored):
+            results[i] = r
+        for phase, seconds in group_phases.items():
+            phases[phase] = phases.get(phase, 0.0) + seconds
+    metrics.observe_analysis(phases)
+    return results
+
+def _batch_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_BYTES} bytes")
+
+async def _read_body(request: Request) -> bytes:
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BATCH_MAX_BYTES:
+            raise _batch_too_large()
+    return bytes(body)
+
+@app.post("/readability/batch")
+async def analyze_readability_batch(request: Request):
+    """
+    Scores many documents in one request, spread across the process pool.
+
+    Accepts either a JSON array of strings or ``{"id": ..., "text": ...}`` objects,
+    or a multipart form with any number of ``text`` fields and .txt files.
+    Every item gets its own entry in ``results``; items that cannot be scored
+    carry an ``error`` instead of failing the whole batch.
+    """
+    names, texts, errors = [], [], []
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        try:
+            payload = json.loads(await _read_body(request))
+        except ValueError:
+            # malformed JSON or invalid UTF-8
+            raise HTTPException(status_code=400, detail="Malformed JSON")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of documents")
+        if len(payload) > BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} documents per batch")
+        for i, item in enumerate(payload):
+            if isinstance(item, dict):
+                name, text = str(item.get("id", i)), item.get("text")
+            else:
+                name, text = str(i), item
+            names.append(name)
+            texts.append(text if isinstance(text, str) else "")
+            errors.append(None if isinstance(text, str) else "'text' must be a string")
+    elif content_type.startswith("multipart/form-data"):
+        form = await request.form(max_files=BATCH_MAX_ITEMS, max_fields=BATCH_MAX_ITEMS)
+        items = form.multi_items()
+        if len(items) > BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} documents per batch")
+        for i, (key, value) in enumerate(items):
+            if not isinstance(value, StarletteUploadFile):
+                names.append(str(i))
+                texts.append(value)
+                errors.append(None)
+                continue
+            names.append(value.filename)
+            if not value.filename.lower().endswith(".txt"):
+                texts.append("")
+                errors.append("Only .txt files are supported for now")
+                continue
+            try:
+                texts.append("".join([chunk async for chunk in _read_text_chunks(value)]))
+                errors.append(None)
+            except HTTPException as e:
+                texts.append("")
+                errors.append(e.detail)
+        await form.close()
+        # each file is capped by _read_text_chunks; this caps the batch as a whole
+        if sum(len(t) for t in texts) > BATCH_MAX_BYTES:
+            raise _batch_too_large()
+    else:
+        raise HTTPException(status_code=415, detail="Send a JSON array or a multipart form")
+
+    if not texts:
+        raise HTTPException(status_code=400, detail="No documents provided")
+
+    # only documents without an input error are sent for scoring
+    outcomes = [{"error": e} if e else None for e in errors]
+    todo = [i for i, e in enumerate(errors) if e is None]
+    for i, r in zip(todo, await _score_batch([texts[i] for i in todo])):
+        outcomes[i] = r
+
+    results = [{"index": i, "name": name, **r} for i, (name, r) in enumerate(zip(names, outcomes))]
+    failed = sum(1 for r in results if "error" in r)
+    return {"results": results, "succeeded": len(results) - failed, "failed": failed}
+
+@app.get("/readability/history", response_model=schemas.AnalysisHistory)
+async def get_readability_history(
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[int] = Query(None, description="id of the last item of the previous page"),
+    db: database.DB = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user),
+):
+    """The user's saved analyses, newest first, paged by id rather than offset."""
+    def page(db: Session):
+        rows = crud.get_analysis_history(db, user.id, limit, before)
+        return [schemas.AnalysisRecordOut.model_validate(r) for r in rows]
+
+    items = await db.run(page)
+    next_before = items[-1].id if len(items) == limit else None
+    return {"items": items, "next_before": next_before}
+
+@app.get("/readability/summary", response_model=schemas.AnalysisSummaryOut)
+async def get_readability_summary(
+    db: database.DB = Depends(get_db),
+    user: schemas.CurrentUser = Depends(get_current_user),
+):
+    """Aggregates over the user's whole history, read from one summary row."""
+    def summary(db: Session):
+        row = crud.get_analysis_summary(db, user.id)
+        if row is None or not row.count:
+            return {"count": 0, "levels": {"Beginner": 0, "Intermediate": 0, "Advanced": 0}}
+        return {
+            "count": row.count,
+            "mean_flesch_kincaid_re": round(row.flesch_kincaid_re_sum / row.count, 2),
+            "mean_gunning_fog": round(row.gunning_fog_sum / row.count, 2),
+            "mean_smog": round(row.smog_sum / row.count, 2),
+            "levels": {
+                "Beginner": row.beginner_count,
+                "Intermediate": row.intermediate_count,
+                "Advanced": row.advanced_count,
+            },
+        }
+
+    return await db.run(summary)
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    return cache_stats()
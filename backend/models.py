@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Index, func
 from datetime import datetime
 from sqlalchemy import Text
+from sqlalchemy.dialects.mysql import LONGTEXT
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -15,7 +16,8 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)   # only set once
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    profile = relationship("Profile", back_populates="user", uselist=False)
+    # joined: the profile is fetched in the same query as the user
+    profile = relationship("Profile", back_populates="user", uselist=False, lazy="joined")
 
 
 class Profile(Base):
@@ -27,8 +29,73 @@ class Profile(Base):
     language_pref = Column(String(50))
     bio = Column(Text)
     profile_pic = Column(String(255), nullable=True)   # store file path / URL
+    profile_pic_variants = Column(JSON, nullable=True)  # {"thumb": URL, "small": URL} once generated
     created_at = Column(DateTime, default=datetime.utcnow)  # set only on creation
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
-    user = relationship("User", back_populates="profile")
\ No newline at end of file
+    user = relationship("User", back_populates="profile")
+
+
+class ReadabilityCacheEntry(Base):
+    __tablename__ = "readability_cache"
+
+    key = Column(String(64), primary_key=True)   # sha256 of version + normalized text
+    algorithm_version = Column(String(16))
+    result = Column(Text)                        # JSON-encoded readability_scores output
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ReadabilityJob(Base):
+    __tablename__ = "readability_jobs"
+
+    id = Column(String(32), primary_key=True)    # random hex, handed to the client
+    status = Column(String(16), default="queued", nullable=False)  # queued / running / done / failed
+    # MySQL TEXT stops at 64 KB; job documents are much larger
+    text = Column(Text().with_variant(LONGTEXT, "mysql"), nullable=False)
+    result = Column(Text, nullable=True)         # JSON-encoded scores once done
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    # the worker holding the job, and until when; expired leases are reclaimed
+    lease_owner = Column(String(64), nullable=True)
+    lease_expires = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_readability_jobs_status_created", "status", "created_at"),)
+
+
+class AnalysisRecord(Base):
+    __tablename__ = "analysis_records"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    text_key = Column(String(64))                # fingerprint of the analyzed text
+    flesch_kincaid_re = Column(Float)
+    gunning_fog = Column(Float)
+    smog = Column(Float)
+    sentences = Column(Integer)
+    words = Column(Integer)
+    syllables = Column(Integer)
+    complex_words = Column(Integer)
+    level = Column(String(16))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # history is paged newest-first per user by id (keyset pagination)
+    __table_args__ = (Index("ix_analysis_records_user_id_id", "user_id", "id"),)
+
+
+class AnalysisSummary(Base):
+    """Running per-user totals, updated with each new AnalysisRecord."""
+    __tablename__ = "analysis_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+    flesch_kincaid_re_sum = Column(Float, default=0.0, nullable=False)
+    gunning_fog_sum = Column(Float, default=0.0, nullable=False)
+    smog_sum = Column(Float, default=0.0, nullable=False)
+    beginner_count = Column(Integer, default=0, nullable=False)
+    intermediate_count = Column(Integer, default=0, nullable=False)
+    advanced_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,221 @@
+"""
+Offline readability scan of a directory tree of .txt files.
+
+    python -m backend.analysis scan DIR [--output results.csv|results.parquet]
+                                        [--workers N] [--pattern *.txt]
+
+Each file is memory-mapped and decoded incrementally into a
+``ReadabilityAccumulator`` exactly as an upload to ``/readability`` is, so
+the scores match the API. Files are scored across a process pool and rows
+are written as batches complete:
+
+- CSV output is appended to a single file.
+- Parquet output is a directory of part files, readable as one dataset with
+  ``pandas.read_parquet`` (requires pyarrow).
+
+Paths of finished files are appended to ``<output>.checkpoint`` after their
+rows are flushed; rerunning the same command skips them. A crash between the
+two writes can repeat the rows of at most one batch, so de-duplicate on
+``path`` if that matters.
+"""
+import argparse
+import codecs
+import csv
+import fnmatch
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .analysis import ReadabilityAccumulator, readability_level
+
+# bytes decoded and fed per step; only this much of a file is copied at once
+CHUNK_BYTES = 1024 * 1024
+COLUMNS = [
+    "path", "bytes", "flesch_kincaid_re", "gunning_fog", "smog",
+    "sentences", "words", "syllables", "complex_words", "level", "error",
+]
+
+
+def score_file(root: str, rel_path: str) -> dict:
+    path = os.path.join(root, rel_path)
+    row = {"path": rel_path}
+    try:
+        size = os.path.getsize(path)
+        row["bytes"] = size
+        acc = ReadabilityAccumulator()
+        has_content = False
+        if size:
+            # same decoding as uploads to the API: invalid UTF-8 is dropped
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, size, CHUNK_BYTES):
+                    chunk = decoder.decode(mm[start:start + CHUNK_BYTES])
+                    has_content = has_content or (bool(chunk) and not chunk.isspace())
+                    acc.feed(chunk)
+                chunk = decoder.decode(b"", final=True)
+                has_content = has_content or (bool(chunk) and not chunk.isspace())
+                acc.feed(chunk)
+        if not has_content:
+            row["error"] = "Empty text"
+            return row
+        scores = acc.result()
+        scores["level"] = readability_level(scores["flesch_kincaid_re"])
+        row.update(scores)
+    except (OSError, ValueError) as e:
+        row["error"] = str(e)
+    return row
+
+
+def score_files(root: str, rel_paths: list) -> list:
+    """One pool task: a handful of files, to amortize inter-process overhead."""
+    return [score_file(root, rel_path) for rel_path in rel_paths]
+
+
+def find_files(root: str, pattern: str, done: set):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if fnmatch.fnmatch(name, pattern):
+                rel_path = os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/")
+                if rel_path not in done:
+                    yield rel_path
+
+
+def _batches(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class CsvSink:
+    def __init__(self, path: str):
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        if not exists:
+            self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    def __init__(self, path: str):
+        # fail before scanning starts, not at the first flush, without pandas
+        # or the pyarrow engine that to_parquet needs
+        import pandas  # noqa: F401
+        import pyarrow  # noqa: F401
+
+        os.makedirs(path, exist_ok=True)
+        self._dir = path
+        self._part = len([n for n in os.listdir(path) if n.endswith(".parquet")])
+
+    def write(self, rows):
+        import pandas as pd
+
+        frame = pd.DataFrame(rows, columns=COLUMNS)
+        tmp = os.path.join(self._dir, f".part-{self._part:05d}.tmp")
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(self._dir, f"part-{self._part:05d}.parquet"))
+        self._part += 1
+
+    def close(self):
+        pass
+
+
+def scan(root: str, output: str, workers: int, pattern: str = "*.txt",
+         files_per_task: int = 16, flush_every: int = 1000, progress=None) -> int:
+    """Scans `root` into `output`, resuming from its checkpoint. Returns the files scanned."""
+    checkpoint = output + ".checkpoint"
+    done = set()
+    if os.path.exists(checkpoint):
+        with open(checkpoint, encoding="utf-8") as f:
+            done = {line.rstrip("\n") for line in f if line.strip()}
+
+    sink = ParquetSink(output) if output.endswith(".parquet") else CsvSink(output)
+    ckpt = open(checkpoint, "a", encoding="utf-8")
+    pending_rows = []
+    scanned = 0
+
+    def flush():
+        if not pending_rows:
+            return
+        sink.write(pending_rows)
+        # only after the rows are durable
+        ckpt.writelines(row["path"] + "\n" for row in pending_rows)
+        ckpt.flush()
+        os.fsync(ckpt.fileno())
+        pending_rows.clear()
+
+    tasks = _batches(find_files(root, pattern, done), files_per_task)
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            # a bounded window of tasks in flight, so a huge tree is never listed up front
+            running = set()
+            for batch in tasks:
+                running.add(pool.submit(score_files, root, batch))
+                if len(running) < workers * 4:
+                    continue
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    rows = future.result()
+                    pending_rows.extend(rows)
+                    scanned += len(rows)
+                if len(pending_rows) >= flush_every:
+                    flush()
+                    if progress:
+                        progress(scanned)
+            for future in running:
+                rows = future.result()
+                pending_rows.extend(rows)
+                scanned += len(rows)
+    finally:
+        # keep whatever finished before an interrupt
+        flush()
+        sink.close()
+        ckpt.close()
+    return scanned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.analysis")
+    commands = parser.add_subparsers(dest="command", required=True)
+    cmd = commands.add_parser("scan", help="score every .txt file under a directory")
+    cmd.add_argument("root", metavar="DIR")
+    cmd.add_argument("--output", default="readability.csv", help="a .csv file or a .parquet directory")
+    cmd.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    cmd.add_argument("--pattern", default="*.txt", help="file name pattern to scan")
+    cmd.add_argument("--files-per-task", type=int, default=16)
+    cmd.add_argument("--flush-every", type=int, default=1000, help="rows per output/checkpoint write")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def progress(scanned):
+        print(f"\r{scanned} files, {scanned / (time.perf_counter() - start):.0f}/s", end="", file=sys.stderr)
+
+    try:
+        scanned = scan(args.root, args.output, args.workers, args.pattern,
+                       args.files_per_task, args.flush_every, progress)
+    except KeyboardInterrupt:
+        print("\nInterrupted; rerun the same command to resume", file=sys.stderr)
+        sys.exit(130)
+    print(f"\rScanned {scanned} file(s) in {time.perf_counter() - start:.1f}s -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
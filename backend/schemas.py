@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 # ---------------- PROFILE ----------------
 class ProfileBase(BaseModel):
@@ -18,9 +18,10 @@ class ProfileOut(ProfileBase):
     created_at: datetime
     updated_at: datetime
     profile_pic: Optional[str] = None  # Ensure it shows up in API response
+    profile_pic_variants: Optional[Dict[str, str]] = None  # WebP thumbnails, filled in after upload
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 # ---------------- USER ----------------
 class UserBase(BaseModel):
@@ -39,7 +40,43 @@ class UserOut(UserBase):
     class Config:
         from_attributes = True
 
+class CurrentUser(BaseModel):
+    """The authenticated user as cached per token; no ORM state attached."""
+    id: int
+    email: str
+    name: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 # ---------------- LOGIN ----------------
 class LoginRequest(BaseModel):
     email: str
     password: str
+
+# ---------------- ANALYSIS HISTORY ----------------
+class AnalysisRecordOut(BaseModel):
+    id: int
+    flesch_kincaid_re: float
+    gunning_fog: float
+    smog: float
+    sentences: int
+    words: int
+    syllables: int
+    complex_words: int
+    level: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AnalysisHistory(BaseModel):
+    items: List[AnalysisRecordOut]
+    next_before: Optional[int] = None  # pass as ?before= to get the next (older) page
+
+class AnalysisSummaryOut(BaseModel):
+    count: int
+    mean_flesch_kincaid_re: Optional[float] = None
+    mean_gunning_fog: Optional[float] = None
+    mean_smog: Optional[float] = None
+    levels: Dict[str, int]
@@ -0,0 +1,222 @@
+"""
+Content-addressed storage for uploaded profile pictures.
+
+Files are stored under UPLOAD_DIR as ``ab/cd/<sha256><ext>``, so identical
+images are kept once and different users' uploads never collide.
+
+After upload, WebP thumbnails (DERIVATIVE_SIZES) are generated next to the
+original as ``<sha256>.<size>.webp`` when Pillow is installed.
+
+Remove files no profile refers to any more with:
+
+    python -m backend.storage gc [--dry-run] [--min-age SECONDS]
+"""
+import argparse
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # thumbnails are skipped without Pillow
+    Image = None
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+PROFILE_PIC_MAX_BYTES = int(os.getenv("PROFILE_PIC_MAX_BYTES", 5 * 1024 * 1024))
+CHUNK_SIZE = 64 * 1024
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+# name -> bounding box in pixels of the generated WebP derivatives
+DERIVATIVE_SIZES = {"thumb": 200, "small": 64}
+WEBP_QUALITY = int(os.getenv("WEBP_QUALITY", 80))
+
+# partial uploads live here until they are complete
+_TMP_DIR = os.path.join(UPLOAD_DIR, ".tmp")
+# names produced by the store: content hash, optional size, extension
+_STORED_NAME = re.compile(r"^[0-9a-f]{64}(\.\d+)?\.[a-z]+$")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UnsupportedImage(Exception):
+    pass
+
+
+def _reuse(path: str) -> bool:
+    """
+    True if `path` is already stored. Its mtime is refreshed, so a concurrent
+    gc treats it as new (see --min-age) until the profile pointing to it is
+    committed.
+    """
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def store_image(fileobj, filename: str) -> str:
+    """
+    Streams an image into the store and returns its path relative to
+    UPLOAD_DIR. The upload is written to a temp file in fixed-size chunks
+    and hashed on the way, then atomically renamed into place; if the same
+    content is already stored, the temp file is simply dropped.
+    """
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in IMAGE_EXTENSIONS:
+        raise UnsupportedImage(ext)
+    if ext == ".jpeg":
+        ext = ".jpg"
+
+    os.makedirs(_TMP_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=_TMP_DIR)
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = fileobj.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > PROFILE_PIC_MAX_BYTES:
+                    raise UploadTooLarge(size)
+                digest.update(chunk)
+                out.write(chunk)
+
+        name = digest.hexdigest() + ext
+        rel_path = f"{name[:2]}/{name[2:4]}/{name}"
+        dest = os.path.join(UPLOAD_DIR, rel_path)
+        if _reuse(dest):
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(tmp_path, dest)
+        return rel_path
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def generate_derivatives(rel_path: str) -> dict:
+    """
+    Writes WebP thumbnails of a stored image and returns {name: rel_path}.
+    Derivatives that already exist are reused; returns {} without Pillow or
+    for files Pillow cannot read.
+    """
+    if Image is None:
+        return {}
+    source = os.path.join(UPLOAD_DIR, rel_path)
+    stem = os.path.splitext(rel_path)[0]
+    derivatives = {}
+    try:
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+            for name, size in DERIVATIVE_SIZES.items():
+                derived = f"{stem}.{size}.webp"
+                dest = os.path.join(UPLOAD_DIR, derived)
+                if not _reuse(dest):
+                    thumb = image.copy()
+                    thumb.thumbnail((size, size))
+                    os.makedirs(_TMP_DIR, exist_ok=True)
+                    fd, tmp_path = tempfile.mkstemp(dir=_TMP_DIR)
+                    try:
+                        with os.fdopen(fd, "wb") as out:
+                            thumb.save(out, "WEBP", quality=WEBP_QUALITY)
+                        os.replace(tmp_path, dest)
+                    except BaseException:
+                        os.unlink(tmp_path)
+                        raise
+                derivatives[name] = derived
+    except (OSError, Image.DecompressionBombError):
+        return {}
+    return derivatives
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    Serves the upload store. Stored names are content hashes, so for them the
+    file name is a strong ETag and the response may be cached indefinitely;
+    If-None-Match is answered with 304. Other files get the default handling.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        name = os.path.basename(full_path)
+        if not _STORED_NAME.match(name):
+            return super().file_response(full_path, stat_result, scope, status_code)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["etag"] = f'"{name}"'
+        response.headers["cache-control"] = "public, max-age=31536000, immutable"
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def _referenced_paths(db) -> set:
+    """Paths under UPLOAD_DIR that some profile's picture URL points to."""
+    from . import models
+
+    referenced = set()
+    rows = db.query(models.Profile.profile_pic).filter(models.Profile.profile_pic.isnot(None))
+    for (url,) in rows.yield_per(1000):
+        _, sep, rel_path = url.partition("/uploads/")
+        if sep:
+            referenced.add(rel_path)
+            # derivatives belong to their original
+            stem = os.path.splitext(rel_path)[0]
+            referenced.update(f"{stem}.{size}.webp" for size in DERIVATIVE_SIZES.values())
+    return referenced
+
+
+def collect_garbage(db, min_age: float = 3600, dry_run: bool = False) -> list:
+    """
+    Deletes stored files no profile refers to. Files younger than `min_age`
+    seconds are kept, since their profile may not be committed yet.
+    """
+    referenced = _referenced_paths(db)
+    cutoff = time.time() - min_age
+    removed = []
+    for root, dirs, files in os.walk(UPLOAD_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, UPLOAD_DIR).replace(os.sep, "/")
+            if rel_path in referenced or os.path.getmtime(path) > cutoff:
+                continue
+            removed.append(rel_path)
+            if not dry_run:
+                os.unlink(path)
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.storage")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gc = commands.add_parser("gc", help="remove uploaded files no profile refers to")
+    gc.add_argument("--dry-run", action="store_true", help="only list the files")
+    gc.add_argument("--min-age", type=float, default=3600, help="keep files newer than this (seconds)")
+    args = parser.parse_args(argv)
+
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        removed = collect_garbage(db, min_age=args.min_age, dry_run=args.dry_run)
+    finally:
+        db.close()
+    for rel_path in removed:
+        print(rel_path)
+    print(f"{'Would remove' if args.dry_run else 'Removed'} {len(removed)} file(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+def _started():
+    pass
+
+
+# API worker processes on this host. uvicorn also reads it as the default for
+# --workers, so setting it (instead of passing --workers) keeps the two in step.
+API_WORKERS = max(int(os.getenv("WEB_CONCURRENCY", 1)), 1)
+
+
+def default_pool_size() -> int:
+    """
+    Default size of each process pool in an API process. Every API worker
+    has its own bcrypt and scoring pools, so the host runs API_WORKERS x
+    (AUTH_POOL_WORKERS + READABILITY_POOL_WORKERS) pool processes in total.
+    The default gives each pool half the cores, divided between the API
+    workers.
+    """
+    return max((os.cpu_count() or 1) // (2 * API_WORKERS), 1)
+
+
+class PoolUnavailable(Exception):
+    """The pool cannot take this call right now; callers answer 503."""
+
+
+class PoolSaturated(PoolUnavailable):
+    """Raised when a pool already has its maximum number of tasks queued or running."""
+
+
+class PoolBroken(PoolUnavailable):
+    """Raised when a worker process died during the call; the next call gets a fresh pool."""
+
+
+class BoundedProcessPool:
+    """
+    Process pool for CPU-bound work called from async endpoints.
+
+    At most ``max_pending`` tasks may be queued or running at once; further
+    calls fail fast with ``PoolSaturated`` instead of piling up behind the
+    busy workers. Worker processes are started on first use or by ``start``,
+    and run ``initializer`` (if given) as they start. A worker that dies
+    (e.g. OOM-killed) breaks the executor for every task in it; those calls
+    fail with ``PoolBroken`` and the executor is replaced.
+    """
+
+    def __init__(self, workers: int, max_pending: int, initializer=None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.initializer = initializer
+        self._executor = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the server process has threads and open DB connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+            )
+        return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        # calls that were running on the broken executor all end up here
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self):
+        """
+        Starts every worker process now rather than on first use. One task
+        per worker is submitted at once, and the executor starts a new
+        process for each task that finds no idle worker.
+        """
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(executor, _started) for _ in range(self.workers)))
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise PoolBroken()
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise PoolSaturated()
+        executor = self._get_executor()
+        # only touched from the event loop thread, so no lock is needed
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise PoolBroken()
+        finally:
+            self.pending -= 1
+
+    async def map(self, fn, arg_list):
+        """
+        Runs ``fn(args)`` for every item of ``arg_list`` concurrently. Capacity for
+        the whole group is reserved up front, so it is rejected as a unit
+        rather than failing halfway through.
+        """
+        if self.pending + len(arg_list) > self.max_pending:
+            raise PoolSaturated()
+        executor = self._get_executor()
+        self.pending += len(arg_list)
+        try:
+            loop = asyncio.get_running_loop()
+            return await asyncio.gather(
+                *(loop.run_in_executor(executor, fn, args) for args in arg_list)
+            )
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise PoolBroken()
+        finally:
+            self.pending -= len(arg_list)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,57 @@
+"""
+Login throughput: bcrypt verification inline on one thread versus the
+auth process pool.
+
+    python -m benchmarks.bench_auth [logins]
+"""
+import asyncio
+import sys
+import time
+
+from backend import auth
+
+PASSWORD = "Benchmark1"
+
+
+def run_inline(hashed: str, logins: int) -> float:
+    start = time.perf_counter()
+    for _ in range(logins):
+        auth.verify_password(PASSWORD, hashed)
+    return logins / (time.perf_counter() - start)
+
+
+async def _run_pool(hashed: str, logins: int) -> float:
+    # warm the worker processes so their startup is not measured
+    await asyncio.gather(*(auth.check_password(PASSWORD, hashed) for _ in range(auth.hash_pool.workers)))
+    start = time.perf_counter()
+    done = 0
+    while done < logins:
+        batch = min(auth.hash_pool.max_pending, logins - done)
+        await asyncio.gather(*(auth.check_password(PASSWORD, hashed) for _ in range(batch)))
+        done += batch
+    return logins / (time.perf_counter() - start)
+
+
+def run(logins: int = 32):
+    hashed = auth.get_password_hash(PASSWORD)
+    inline = run_inline(hashed, logins)
+    try:
+        pooled = asyncio.run(_run_pool(hashed, logins))
+    finally:
+        auth.hash_pool.shutdown()
+    workers = auth.hash_pool.workers
+    return {
+        "bcrypt_rounds": auth.BCRYPT_ROUNDS,
+        "workers": workers,
+        "inline_logins_per_s": inline,
+        "pool_logins_per_s": pooled,
+        "pool_logins_per_s_per_core": pooled / workers,
+    }
+
+
+if __name__ == "__main__":
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
+    print(f"bcrypt rounds: {r['bcrypt_rounds']}, pool workers: {r['workers']}")
+    print(f"inline (1 core):  {r['inline_logins_per_s']:8.1f} logins/s")
+    print(f"process pool:     {r['pool_logins_per_s']:8.1f} logins/s "
+          f"({r['pool_logins_per_s_per_core']:.1f} per core)")
@@ -0,0 +1,52 @@
+"""
+Compares readability scoring with and without the syllable cache.
+
+    python -m benchmarks.bench_syllable_cache
+"""
+import time
+
+from backend import analysis
+from benchmarks.corpus import SIZES, make_text
+
+
+def _best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=("paragraph", "article", "chapter")):
+    rows = []
+    for name in sizes:
+        text = make_text(SIZES[name])
+        cache = analysis.syllable_cache
+
+        cache.maxsize = 0
+        cache.clear()
+        uncached = _best_of(lambda: analysis.readability_scores(text))
+
+        cache.maxsize = analysis.SYLLABLE_CACHE_SIZE
+        cache.clear()
+        analysis.readability_scores(text)  # warm the cache
+        cached = _best_of(lambda: analysis.readability_scores(text))
+
+        rows.append({
+            "size": name,
+            "chars": len(text),
+            "uncached_s": uncached,
+            "cached_s": cached,
+            "speedup": uncached / cached,
+            **{f"cache_{k}": v for k, v in cache.info().items()},
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'size':<10} {'chars':>9} {'uncached ms':>12} {'cached ms':>10} {'speedup':>8} {'hit rate':>9}")
+    for r in run():
+        hit_rate = r["cache_hits"] / max(r["cache_hits"] + r["cache_misses"], 1)
+        print(f"{r['size']:<10} {r['chars']:>9} {r['uncached_s'] * 1000:>12.2f} "
+              f"{r['cached_s'] * 1000:>10.2f} {r['speedup']:>7.2f}x {hit_rate:>8.1%}")
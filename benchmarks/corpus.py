@@ -0,0 +1,56 @@
+"""Sample English text for the benchmarks, built from public-domain prose."""
+import random
+
+PASSAGES = [
+    # Jane Austen, Pride and Prejudice (1813)
+    "It is a truth universally acknowledged, that a single man in possession of a good fortune, "
+    "must be in want of a wife. However little known the feelings or views of such a man may be "
+    "on his first entering a neighbourhood, this truth is so well fixed in the minds of the "
+    "surrounding families, that he is considered the rightful property of some one or other of "
+    "their daughters. My dear Mr. Bennet, said his lady to him one day, have you heard that "
+    "Netherfield Park is let at last? Mr. Bennet replied that he had not. But it is, returned she; "
+    "for Mrs. Long has just been here, and she told me all about it.",
+    # Charles Darwin, On the Origin of Species (1859)
+    "When we look to the individuals of the same variety or sub-variety of our older cultivated "
+    "plants and animals, one of the first points which strikes us, is, that they generally differ "
+    "much more from each other, than do the individuals of any one species or variety in a state "
+    "of nature. When we reflect on the vast diversity of the plants and animals which have been "
+    "cultivated, and which have varied during all ages under the most different climates and "
+    "treatment, I think we are driven to conclude that this greater variability is simply due to "
+    "our domestic productions having been raised under conditions of life not so uniform as, and "
+    "somewhat different from, those to which the parent-species have been exposed under nature.",
+    # Mark Twain, Adventures of Huckleberry Finn (1884)
+    "You don't know about me without you have read a book by the name of The Adventures of Tom "
+    "Sawyer; but that ain't no matter. That book was made by Mr. Mark Twain, and he told the "
+    "truth, mainly. There was things which he stretched, but mainly he told the truth. That is "
+    "nothing. I never seen anybody but lied one time or another, without it was Aunt Polly, or "
+    "the widow, or maybe Mary.",
+    # Abraham Lincoln, Gettysburg Address (1863)
+    "Four score and seven years ago our fathers brought forth on this continent, a new nation, "
+    "conceived in Liberty, and dedicated to the proposition that all men are created equal. Now "
+    "we are engaged in a great civil war, testing whether that nation, or any nation so conceived "
+    "and so dedicated, can long endure. We are met on a great battle-field of that war.",
+]
+
+SENTENCES = [s.strip() + "." for p in PASSAGES for s in p.split(".") if s.strip()]
+
+# approximate sizes in characters, from a tweet to a book
+SIZES = {
+    "tweet": 280,
+    "paragraph": 1_500,
+    "article": 20_000,
+    "chapter": 200_000,
+    "book": 2_000_000,
+}
+
+def make_text(chars: int, seed: int = 0) -> str:
+    """Shuffled sentences from PASSAGES, roughly `chars` characters long."""
+    rng = random.Random(seed)
+    out, size = [], 0
+    while size < chars:
+        s = rng.choice(SENTENCES)
+        out.append(s)
+        size += len(s) + 1
+        if rng.random() < 0.1:
+            out.append("\n\n")
+    return " ".join(out)
@@ -0,0 +1,215 @@
+"""
+Benchmark suite for the analysis functions and the API hot paths.
+
+    python -m benchmarks.run [--only analysis|api] [--sizes tweet,article]
+                             [--output results.json] [--baseline FILE]
+                             [--save-baseline] [--threshold 0.2]
+                             [--require-baseline]
+
+Analysis benchmarks time ``readability_scores``, ``_tokenize`` and
+``_count_syllables`` on every corpus size. API benchmarks drive ``/login``,
+``/profile`` and ``/readability`` through an in-process TestClient against a
+throwaway SQLite database (the ``DATABASE_URL`` SQLite profile). Every benchmark reports throughput and p50/p95/p99
+latency.
+
+Results are written as JSON and compared with the baseline (by default
+benchmarks/baseline.json, written by ``--save-baseline``). The exit status is
+1 when any benchmark's p50 is more than ``--threshold`` slower than in the
+baseline. Timings depend on the machine, so no baseline is committed: CI
+saves one from the target branch on the same runner and then compares. A
+missing baseline is an error with ``--require-baseline``, which is the
+default when the ``CI`` environment variable is set.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from backend import analysis
+from benchmarks.corpus import SIZES, make_text
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _summarize(samples, units_per_sample: float = 1.0) -> dict:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "samples": len(samples),
+        "throughput_per_s": units_per_sample * len(samples) / sum(samples),
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+    }
+
+
+def _measure(fn, min_time: float, min_samples: int = 5, max_samples: int = 1000) -> list:
+    """Calls `fn(i)` until `min_time` seconds and `min_samples` calls have passed."""
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_samples and (len(samples) < min_samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn(len(samples))
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# ---------------- ANALYSIS ----------------
+def run_analysis(sizes, min_time: float) -> dict:
+    results = {}
+    for name in sizes:
+        text = make_text(SIZES[name])
+        _, words = analysis._tokenize(text)
+
+        def count_syllables(_):
+            for word in words:
+                analysis._count_syllables(word)
+
+        # readability_scores runs with a warm syllable cache, as in a long-running server
+        analysis.syllable_cache.clear()
+        analysis.readability_scores(text)
+        for bench, fn, units in (
+            ("readability_scores", lambda _: analysis.readability_scores(text), len(text)),
+            ("tokenize", lambda _: analysis._tokenize(text), len(text)),
+            ("count_syllables", count_syllables, len(words)),
+        ):
+            stats = _summarize(_measure(fn, min_time), units)
+            stats["unit"] = "chars" if bench != "count_syllables" else "words"
+            results[f"analysis.{bench}[{name}]"] = stats
+    return results
+
+
+# ---------------- API ----------------
+def run_api(min_time: float) -> dict:
+    workdir = tempfile.mkdtemp(prefix="readability-bench-")
+    # storage and database read these on import
+    os.environ["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from fastapi.testclient import TestClient
+
+    from backend import database
+    from backend.main import app
+
+    database.Base.metadata.create_all(database.engine)
+    email, password = "bench@example.com", "Benchmark1"
+    profile = {"name": "Bench", "age_group": "18-25", "language_pref": "English", "bio": "Benchmark user"}
+    article = make_text(SIZES["article"])
+
+    results = {}
+    try:
+        with TestClient(app) as client:
+            client.post("/register", json={"name": "Bench", "email": email, "password": password}).raise_for_status()
+
+            def login(_):
+                client.post("/login", json={"email": email, "password": password}).raise_for_status()
+
+            results["api.login"] = _summarize(_measure(login, min_time))
+            token = client.post("/login", json={"email": email, "password": password}).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            def save_profile(i):
+                data = dict(profile, bio=f"Benchmark user {i}")
+                client.post("/profile", data=data, headers=headers).raise_for_status()
+
+            def read_profile(_):
+                client.get(f"/profile/{email}", headers=headers).raise_for_status()
+
+            results["api.profile_post"] = _summarize(_measure(save_profile, min_time))
+            results["api.profile_get"] = _summarize(_measure(read_profile, min_time))
+
+            def readability_miss(i):
+                # a distinct text every time so the result cache is not hit
+                r = client.post("/readability", data={"text": f"Sample {i}. {article}"})
+                r.raise_for_status()
+                assert r.headers["X-Cache"] == "MISS"
+
+            def readability_hit(_):
+                r = client.post("/readability", data={"text": article})
+                r.raise_for_status()
+
+            results["api.readability_miss[article]"] = _summarize(_measure(readability_miss, min_time))
+            client.post("/readability", data={"text": article})
+            results["api.readability_hit[article]"] = _summarize(_measure(readability_hit, min_time))
+    finally:
+        database.engine.dispose()
+    for stats in results.values():
+        stats["unit"] = "requests"
+    return results
+
+
+# ---------------- BASELINE ----------------
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Rows of (name, baseline p50, current p50, ratio, regressed)."""
+    rows = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = stats["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 1.0
+        rows.append((name, before["p50_ms"], stats["p50_ms"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--only", choices=["analysis", "api"])
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma-separated corpus sizes")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to spend per benchmark")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown, 0.2 = 20%%")
+    parser.add_argument(
+        "--require-baseline", action="store_true", default=bool(os.getenv("CI")),
+        help="fail when there is no baseline to compare with (default when $CI is set)",
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.only != "api":
+        results.update(run_analysis(args.sizes.split(","), args.min_time))
+    if args.only != "analysis":
+        results.update(run_api(args.min_time))
+
+    print(f"{'benchmark':<40} {'throughput/s':>14} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<40} {r['throughput_per_s']:>14.1f} {r['p50_ms']:>10.3f} "
+              f"{r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f}")
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 2 if args.require_baseline else 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    rows = compare(results, baseline, args.threshold)
+    print(f"\n{'benchmark':<40} {'baseline p50':>13} {'p50':>10} {'change':>8}")
+    for name, before, after, ratio, regressed in rows:
+        print(f"{name:<40} {before:>13.3f} {after:>10.3f} {ratio - 1:>+7.1%}{'  REGRESSION' if regressed else ''}")
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
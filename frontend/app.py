@@ -1,10 +1,17 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+import hashlib
+import io
+import json
 import re
-import textstat
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 API_URL = "http://127.0.0.1:8000"  # FastAPI backend
+API_TIMEOUT = (3.05, 60)  # seconds to connect, seconds to wait for a response
+API_POOL_SIZE = 32  # keep-alive connections kept open to the backend
+# longer texts are analyzed through the streaming endpoint with live progress
+STREAM_MIN_CHARS = 100_000
 st.set_page_config(page_title="Text Morph", page_icon="🌀", layout="centered")
 
 # ---------------- Session State ----------------
@@ -22,6 +29,9 @@ if "lang_prefill" not in st.session_state:
     st.session_state["lang_prefill"] = "English"
 if "bio_prefill" not in st.session_state:
     st.session_state["bio_prefill"] = ""
+# backend handle for incremental re-analysis of the dashboard text
+if "analysis_session" not in st.session_state:
+    st.session_state["analysis_session"] = None
 # keep track of last-uploaded image object for preview (optional)
 if "last_profile_pic" not in st.session_state:
     st.session_state["last_profile_pic"] = None
@@ -33,6 +43,122 @@ def is_valid_email(email: str) -> bool:
 def is_strong_password(password: str) -> bool:
     return (len(password) >= 8 and any(c.isdigit() for c in password) and any(c.isupper() for c in password))
 
+def auth_headers() -> dict:
+    return {"Authorization": f"Bearer {st.session_state['token']}"}
+
+def profile_image_url(profile: dict):
+    """Prefers the server-made 200px thumbnail over the full-size upload."""
+    variants = profile.get("profile_pic_variants") or {}
+    return variants.get("thumb") or profile.get("profile_pic")
+
+@st.cache_resource
+def http() -> requests.Session:
+    """One keep-alive connection pool to the backend, shared by all user sessions."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def api(method: str, path: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", API_TIMEOUT)
+    return http().request(method, f"{API_URL}{path}", **kwargs)
+
+def session_scores(text: str, headers: dict) -> dict:
+    """
+    Scores the text through the backend's incremental analysis session, so
+    after an edit only the changed paragraphs are re-counted.
+    """
+    session_id = st.session_state.get("analysis_session")
+    if session_id:
+        r = api("PUT", f"/readability/sessions/{session_id}", data={"text": text}, headers=headers)
+        if r.status_code != 404:
+            r.raise_for_status()
+            return r.json()
+    # no session yet, or it expired / lives on another backend worker
+    r = api("POST", "/readability/sessions", data={"text": text}, headers=headers)
+    r.raise_for_status()
+    data = r.json()
+    st.session_state["analysis_session"] = data["session_id"]
+    return data
+
+@st.cache_data(max_entries=1024, ttl=3600, show_spinner=False)
+def score_text(digest: str, email: str, _text: str, _headers: dict) -> dict:
+    """
+    Backend readability scores, memoized on `digest` (the text is not hashed
+    again) and `email`, so each user's analysis still reaches their history.
+    Only exact repeats are served from here; edited text goes to the session.
+    """
+    scores = session_scores(_text, _headers)
+    return {k: v for k, v in scores.items() if k not in ("session_id", "paragraphs_recounted")}
+
+def analyze_text(content: str) -> dict:
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return score_text(digest, st.session_state["email"], content, auth_headers())
+
+def stream_analysis(content: str, on_progress) -> dict:
+    """
+    Scores the text through /readability/stream, calling `on_progress` with
+    each progress event. Leaving early (e.g. the script is rerun) closes the
+    connection, which cancels the analysis on the server.
+    """
+    with api("POST", "/readability/stream", data={"text": content}, headers=auth_headers(), stream=True) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["event"] == "progress":
+                on_progress(event)
+            elif event["event"] == "error":
+                raise RuntimeError(event["detail"])
+            else:
+                return event
+    raise RuntimeError("Analysis ended without a result")
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def readability_chart(raw_values: tuple) -> bytes:
+    """PNG bar chart of the three scores, scaled relative to the largest."""
+    # avoid division by zero / negative weirdness: use max(abs()) if needed
+    max_val = max(raw_values) if max(raw_values) > 0 else 1
+    values = [(v / max_val) * 100 for v in raw_values]
+
+    categories = ["Beginner", "Intermediate", "Advanced"]
+    colors = ["#4CAF50", "#FFC107", "#F44336"]
+
+    # a standalone Figure, not pyplot: no global state shared between sessions
+    fig = Figure(figsize=(8,5))
+    ax = fig.subplots()
+    bars = ax.bar(categories, values, color=colors)
+    ax.set_ylim(0, 120)
+    ax.set_ylabel("Score (normalized %)")
+    ax.set_title("Readability Levels")
+
+    # Add values on top of bars (show original score + percentage)
+    for bar, raw, val in zip(bars, raw_values, values):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 2,
+                f"{raw:.2f} ({val:.1f}%)", ha='center', fontsize=10, fontweight="bold")
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def level_chart(levels: tuple) -> bytes:
+    """PNG bar chart of how many documents fell into each level."""
+    names = [name for name, _ in levels]
+    counts = [count for _, count in levels]
+
+    fig = Figure(figsize=(8,3))
+    ax = fig.subplots()
+    ax.bar(names, counts, color=["#4CAF50", "#FFC107", "#F44336"])
+    ax.set_ylabel("Documents")
+    ax.set_title("Level Distribution")
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
 def header_nav():
     # Top navigation buttons (Profile, Dashboard, Logout)
     if st.session_state["token"]:
@@ -50,6 +176,7 @@ def header_nav():
                 st.session_state["page"] = "auth"
                 st.session_state["token"] = None
                 st.session_state["email"] = None
+                st.session_state["analysis_session"] = None
                 st.rerun()
 
 # ---------------- AUTH ----------------
@@ -74,7 +201,7 @@ if st.session_state["page"] == "auth":
             else:
                 payload = {"name": name, "email": email, "password": password}
                 try:
-                    r = requests.post(f"{API_URL}/register", json=payload)
+                    r = api("POST", "/register", json=payload)
                     if r.status_code == 200:
                         st.success("✅ Registration successful! You can now log in.")
                     else:
@@ -94,19 +221,20 @@ if st.session_state["page"] == "auth":
                 st.error("❌ Password cannot be empty")
             else:
                 try:
-                    r = requests.post(f"{API_URL}/login", json={"email": email, "password": password})
+                    r = api("POST", "/login", json={"email": email, "password": password})
                     if r.status_code == 200:
                         st.session_state["token"] = r.json()["access_token"]
                         st.session_state["email"] = email
                         # try to prefill profile if exists
                         try:
-                            pr = requests.get(f"{API_URL}/profile/{email}")
+                            pr = api("GET", f"/profile/{email}", headers=auth_headers())
                             if pr.status_code == 200:
                                 data = pr.json()
                                 st.session_state["name_prefill"] = data.get("name", "")
                                 st.session_state["age_prefill"] = data.get("age_group", "<18")
                                 st.session_state["lang_prefill"] = data.get("language_pref", "English")
                                 st.session_state["bio_prefill"] = data.get("bio", "") or ""
+                                st.session_state["profile_pic_url"] = profile_image_url(data)
                                 # leave user at dashboard if profile exists
                                 st.session_state["page"] = "dashboard"
                             else:
@@ -171,7 +299,7 @@ elif st.session_state["page"] == "profile":
                 files["profile_pic"] = (profile_pic.name, profile_pic.getvalue(), profile_pic.type)
 
             try:
-                r = requests.post(f"{API_URL}/profile", data=payload, files=files)
+                r = api("POST", "/profile", data=payload, files=files, headers=auth_headers())
                 if r.status_code == 200:
                     st.success("✅ Profile saved successfully!")
 
@@ -182,7 +310,7 @@ elif st.session_state["page"] == "profile":
                     st.session_state["age_prefill"] = saved["age_group"]
                     st.session_state["lang_prefill"] = saved["language_pref"]
                     st.session_state["bio_prefill"] = saved["bio"] or ""
-                    st.session_state["profile_pic_url"] = saved.get("profile_pic_url")  # ✅ persist pic URL
+                    st.session_state["profile_pic_url"] = profile_image_url(saved)  # ✅ persist pic URL
 
                     # ✅ Show updated profile block
                     st.subheader("📌 Saved Profile")
@@ -231,38 +359,63 @@ elif st.session_state["page"] == "dashboard":
             st.warning("⚠️ Please upload or paste some text before analyzing.")
         else:
             # Compute readability scores
-            flesch_kincaid = textstat.flesch_kincaid_grade(content)
-            gunning_fog = textstat.gunning_fog(content)
-            smog_index = textstat.smog_index(content)
+            try:
+                if len(content) >= STREAM_MIN_CHARS:
+                    progress = st.progress(0.0, text="Analyzing...")
+                    live = st.empty()
+
+                    def show_progress(event):
+                        progress.progress(
+                            min(event["done"] / max(event["total"], 1), 1.0),
+                            text=f"Analyzing... {event['words']:,} words so far",
+                        )
+                        live.caption(
+                            f"So far: Flesch {event['flesch_kincaid_re']:.2f} · "
+                            f"Fog {event['gunning_fog']:.2f} · SMOG {event['smog']:.2f}"
+                        )
+
+                    scores = stream_analysis(content, show_progress)
+                    progress.empty()
+                    live.empty()
+                else:
+                    scores = analyze_text(content)
+            except Exception as e:
+                st.error(f"Server error: {e}")
+                st.stop()
+            flesch_kincaid = scores["flesch_kincaid_re"]
+            gunning_fog = scores["gunning_fog"]
+            smog_index = scores["smog"]
 
             # Show scores in 3 colored boxes
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Flesch-Kincaid", round(flesch_kincaid, 2))
+                st.metric("Flesch Reading Ease", round(flesch_kincaid, 2))
             with col2:
                 st.metric("Gunning Fog", round(gunning_fog, 2))
             with col3:
                 st.metric("SMOG Index", round(smog_index, 2))
 
             # Scale values relative to the max score (no hard 100 cap)
-            raw_values = [flesch_kincaid, gunning_fog, smog_index]
-            # avoid division by zero / negative weirdness: use max(abs()) if needed
-            max_val = max(raw_values) if max(raw_values) > 0 else 1
-            values = [(v / max_val) * 100 for v in raw_values]
-
-            categories = ["Beginner", "Intermediate", "Advanced"]
-            colors = ["#4CAF50", "#FFC107", "#F44336"]
-
-            # Plot bar chart
-            fig, ax = plt.subplots(figsize=(8,5))
-            bars = ax.bar(categories, values, color=colors)
-            ax.set_ylim(0, 120)
-            ax.set_ylabel("Score (normalized %)")
-            ax.set_title("Readability Levels")
-
-            # Add values on top of bars (show original score + percentage)
-            for bar, raw, val in zip(bars, raw_values, values):
-                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 2,
-                        f"{raw:.2f} ({val:.1f}%)", ha='center', fontsize=10, fontweight="bold")
-
-            st.pyplot(fig)
+            st.image(readability_chart((flesch_kincaid, gunning_fog, smog_index)))
+
+    # ---------------- History ----------------
+    # one summary row on the backend, so this stays fast however long the history is
+    try:
+        r = api("GET", "/readability/summary", headers=auth_headers())
+        summary = r.json() if r.status_code == 200 else None
+    except Exception:
+        summary = None
+    if summary and summary["count"]:
+        st.subheader("📈 Your Readability History")
+        st.caption(f"Averages over {summary['count']} analyzed document(s)")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Avg. Flesch Reading Ease", summary["mean_flesch_kincaid_re"])
+        with col2:
+            st.metric("Avg. Gunning Fog", summary["mean_gunning_fog"])
+        with col3:
+            st.metric("Avg. SMOG Index", summary["mean_smog"])
+        st.image(readability_chart((
+            summary["mean_flesch_kincaid_re"], summary["mean_gunning_fog"], summary["mean_smog"],
+        )))
+        st.image(level_chart(tuple(summary["levels"].items())))
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+import pytest
+
+# the backend reads its settings at import time, so they are set before any test imports it
+_workdir = tempfile.mkdtemp(prefix="textmorph-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_workdir}/test.db",
+    UPLOAD_DIR=os.path.join(_workdir, "uploads"),
+    READABILITY_POOL_WORKERS="0",
+    READABILITY_JOB_WORKERS="0",
+    AUTH_POOL_WORKERS="0",
+    BCRYPT_ROUNDS="4",
+)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from backend import database, models
+    from backend.main import app
+
+    models.Base.metadata.create_all(bind=database.engine)
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def auth(client):
+    """Bearer header for a registered user."""
+    user = {"email": "reader@example.com", "name": "Reader", "password": "Passw0rdX"}
+    assert client.post("/register", json=user).status_code == 200
+    r = client.post("/login", json={"email": user["email"], "password": user["password"]})
+    assert r.status_code == 200
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.fixture
+def expected():
+    """readability_scores plus level, as the endpoints return them."""
+    from backend.analysis import readability_level, readability_scores
+
+    def scores_of(text):
+        scores = readability_scores(text)
+        scores["level"] = readability_level(scores["flesch_kincaid_re"])
+        return scores
+
+    return scores_of
@@ -0,0 +1,143 @@
+import math
+import random
+import re
+
+import pytest
+
+from backend.analysis import (
+    IncrementalReadability,
+    ReadabilityAccumulator,
+    SyllableCache,
+    _count_syllables,
+    corpus_scores,
+    readability_level,
+    readability_scores,
+)
+
+
+# The original whole-text implementation: every optimized path must match it exactly.
+def reference_scores(text):
+    sentences = [s.strip() for s in re.split(r"[.!?]+", text) if s.strip()]
+    words = [w for w in re.split(r"[^\w']+", text) if w.strip()]
+    s_count = max(len(sentences), 1)
+    w_count = max(len(words), 1)
+    syllables = sum(_count_syllables(w) for w in words)
+    complex_words = sum(1 for w in words if _count_syllables(w) >= 3)
+    words_per_sentence = w_count / s_count
+    return {
+        "flesch_kincaid_re": round(206.835 - 1.015 * words_per_sentence - 84.6 * (syllables / w_count), 2),
+        "gunning_fog": round(0.4 * (words_per_sentence + 100 * (complex_words / w_count)), 2),
+        "smog": round(1.0430 * math.sqrt(max(complex_words, 1) * (30.0 / s_count)) + 3.1291, 2),
+        "sentences": s_count,
+        "words": w_count,
+        "syllables": syllables,
+        "complex_words": complex_words,
+    }
+
+
+ALPHABET = list("abcdeiouy xyz'.!?\n\t ,;-") + ["é", "ß", " ", "Ω", "1", "\x1c"]
+WORDS = ["the", "readability", "of", "it's", "extraordinary", "text", "Morph", "naïve", "x"]
+
+
+def random_text(rng, n):
+    return "".join(rng.choice(ALPHABET) for _ in range(n))
+
+
+def random_document(rng, paragraphs):
+    out = []
+    for _ in range(paragraphs):
+        sentences = []
+        for _ in range(rng.randint(1, 4)):
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+            # some sentences run on into the next paragraph
+            sentences.append(sentence + rng.choice([".", "!", "?", "...", ""]))
+        out.append(" ".join(sentences))
+    return "\n\n".join(out)
+
+
+def feed_chunks(rng, text):
+    acc = ReadabilityAccumulator()
+    i = 0
+    while i < len(text):
+        k = rng.randint(1, 20)
+        acc.feed(text[i:i + k])
+        i += k
+    return acc.result()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_accumulator_matches_reference_under_chunked_feeds(seed):
+    rng = random.Random(seed)
+    for _ in range(400):
+        text = random_text(rng, rng.randint(0, 200))
+        want = reference_scores(text)
+        assert readability_scores(text) == want, repr(text)
+        assert feed_chunks(rng, text) == want, repr(text)
+
+
+def test_accumulator_large_document():
+    text = "The quick brown fox jumps. Extraordinary readability! " * 5000
+    acc = ReadabilityAccumulator()
+    for start in range(0, len(text), 65536):
+        acc.feed(text[start:start + 65536])
+    assert acc.result() == reference_scores(text)
+
+
+def test_syllable_cache_counts_and_evicts():
+    cache = SyllableCache(maxsize=2)
+    assert cache.count("Readability") == _count_syllables("readability")
+    assert cache.count("readability") == _count_syllables("readability")
+    cache.count("cat")
+    cache.count("dog")
+    assert cache.info() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2, "maxsize": 2}
+
+    # maxsize 0 disables caching but still counts
+    disabled = SyllableCache(maxsize=0)
+    assert disabled.count("cat") == 1
+    assert disabled.info()["size"] == 0
+
+
+def test_corpus_scores_matches_reference():
+    pytest.importorskip("pandas")
+    rng = random.Random(7)
+    texts = [random_document(rng, rng.randint(1, 6)) for _ in range(200)]
+    texts += ["", "   ", "Hello."]
+    frame = corpus_scores(texts)
+    assert len(frame) == len(texts)
+    for text, row in zip(texts, frame.to_dict("records")):
+        want = reference_scores(text)
+        want["level"] = readability_level(want["flesch_kincaid_re"])
+        got = {k: row[k] for k in want}
+        assert got == want, repr(text)
+
+
+def test_incremental_matches_reference_under_paragraph_edits():
+    rng = random.Random(11)
+    for _ in range(50):
+        handle = IncrementalReadability()
+        paragraphs = random_document(rng, rng.randint(1, 8)).split("\n\n")
+        for _ in range(10):
+            op = rng.choice(["edit", "insert", "delete", "move"])
+            i = rng.randrange(len(paragraphs))
+            if op == "edit":
+                paragraphs[i] = random_document(rng, 1)
+            elif op == "insert":
+                paragraphs.insert(i, random_document(rng, 1))
+            elif op == "delete" and len(paragraphs) > 1:
+                del paragraphs[i]
+            elif op == "move":
+                paragraphs.append(paragraphs.pop(i))
+            text = "\n\n".join(paragraphs)
+            assert handle.update(text) == reference_scores(text), repr(text)
+
+
+def test_incremental_recounts_only_changed_paragraphs():
+    handle = IncrementalReadability()
+    paragraphs = [f"Paragraph number {i} is here." for i in range(10)]
+    handle.update("\n\n".join(paragraphs))
+    assert handle.recounted == 10
+
+    paragraphs[3] = "An edited paragraph."
+    text = "\n\n".join(paragraphs)
+    assert handle.update(text) == reference_scores(text)
+    assert handle.recounted == 1
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from jose import jwt
+
+from backend import auth as auth_module
+
+
+def test_register_rejects_duplicate_email(client, auth):
+    user = {"email": "reader@example.com", "name": "Reader", "password": "Passw0rdX"}
+    assert client.post("/register", json=user).status_code == 400
+
+
+def test_login_rejects_bad_credentials(client, auth):
+    assert client.post("/login", json={"email": "reader@example.com", "password": "wrong"}).status_code == 401
+    assert client.post("/login", json={"email": "nobody@example.com", "password": "Passw0rdX"}).status_code == 401
+
+
+def test_token_is_verified_once_then_cached(client, auth):
+    from backend.main import token_cache
+
+    hits = token_cache.hits
+    assert client.get("/readability/summary", headers=auth).status_code == 200
+    assert client.get("/readability/summary", headers=auth).status_code == 200
+    assert token_cache.hits >= hits + 1
+
+
+def test_invalid_tokens_are_rejected(client):
+    def bearer(token):
+        return {"Authorization": f"Bearer {token}"}
+
+    expired = jwt.encode(
+        {"sub": "reader@example.com", "exp": datetime.utcnow() - timedelta(minutes=1)},
+        auth_module.SECRET_KEY,
+        algorithm=auth_module.ALGORITHM,
+    )
+    unknown_user = auth_module.create_access_token({"sub": "nobody@example.com"})
+    for headers in ({}, bearer("not-a-jwt"), bearer(expired), bearer(unknown_user)):
+        r = client.get("/readability/summary", headers=headers)
+        assert r.status_code == 401, headers
+
+
+def test_optional_auth_accepts_anonymous_but_not_bad_tokens(client):
+    text = {"text": "Anyone may score text."}
+    assert client.post("/readability", data=text).status_code == 200
+    r = client.post("/readability", data=text, headers={"Authorization": "Bearer not-a-jwt"})
+    assert r.status_code == 401
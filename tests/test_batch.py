@@ -0,0 +1,58 @@
+import io
+
+TEXT = "The cat sat on the mat. It was an extraordinarily comfortable mat!\n\nThen it left."
+
+
+def test_batch_json(client, expected):
+    r = client.post("/readability/batch", json=[TEXT, {"id": "b", "text": "Short one."}, "", {"text": 5}])
+    assert r.status_code == 200
+    body = r.json()
+    results = body["results"]
+    assert [x["name"] for x in results] == ["0", "b", "2", "3"]
+    assert {k: results[0][k] for k in expected(TEXT)} == expected(TEXT)
+    assert "error" in results[2] and "error" in results[3]
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+
+
+def test_batch_multipart(client, expected):
+    files = [
+        ("text", (None, TEXT)),
+        ("file", ("a.txt", io.BytesIO(b"A file. With two sentences."), "text/plain")),
+        ("file", ("a.pdf", io.BytesIO(b"%PDF"), "application/pdf")),
+    ]
+    results = client.post("/readability/batch", files=files).json()["results"]
+    assert [x["name"] for x in results] == ["0", "a.txt", "a.pdf"]
+    assert results[1]["sentences"] == expected("A file. With two sentences.")["sentences"]
+    assert "error" in results[2]
+
+
+def test_batch_scored_in_pool_matches_inline(client, monkeypatch):
+    from backend import main
+    from backend.workers import BoundedProcessPool
+
+    texts = [TEXT * (i + 1) for i in range(5)]
+    inline = client.post("/readability/batch", json=texts).json()
+    pool = BoundedProcessPool(workers=2, max_pending=8)
+    monkeypatch.setattr(main, "scoring_pool", pool)
+    monkeypatch.setattr(main, "INLINE_MAX_CHARS", 10)
+    try:
+        assert client.post("/readability/batch", json=texts).json() == inline
+    finally:
+        pool.shutdown()
+
+
+def test_batch_rejects_bad_requests(client, monkeypatch):
+    from backend import main
+
+    json_header = {"content-type": "application/json"}
+    assert client.post("/readability/batch", content=b"[not json", headers=json_header).status_code == 400
+    assert client.post("/readability/batch", content=b"\xff\xfe", headers=json_header).status_code == 400
+    assert client.post("/readability/batch", json={"text": TEXT}).status_code == 400
+    assert client.post("/readability/batch", json=[]).status_code == 400
+    assert client.post("/readability/batch", content=b"x", headers={"content-type": "text/plain"}).status_code == 415
+
+    monkeypatch.setattr(main, "BATCH_MAX_ITEMS", 2)
+    assert client.post("/readability/batch", json=["a", "b", "c"]).status_code == 413
+    monkeypatch.setattr(main, "BATCH_MAX_BYTES", 50)
+    assert client.post("/readability/batch", json=[TEXT]).status_code == 413
+    assert client.post("/readability/batch", files=[("text", (None, TEXT))]).status_code == 413
@@ -0,0 +1,85 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend import auth, bulk, database, models
+
+CSV = """name,email,password,password_hash,age_group,language_pref,bio
+Partial,partial@example.com,Passw0rdX,,18-25,,
+Full,full@example.com,Passw0rdX,,26-40,German,Hello
+NoProfile,noprofile@example.com,Passw0rdX,,,,
+Hashed,hashed@example.com,,{hash},,,
+Dup,partial@example.com,Passw0rdX,,,,
+,noname@example.com,Passw0rdX,,,,
+NoPassword,nopassword@example.com,,,,,
+BadHash,badhash@example.com,,not-a-hash,,,
+"""
+
+
+@pytest.fixture(scope="module")
+def imported(client):
+    db = database.SessionLocal()
+    try:
+        records = bulk._read_records(io.StringIO(CSV.format(hash=auth.pwd_context.hash("Hashed1X"))), "csv")
+        with ThreadPoolExecutor(2) as pool:
+            report = bulk.import_users(db, records, pool, batch_size=3)
+        # importing again only finds duplicates
+        with ThreadPoolExecutor(2) as pool:
+            again = bulk.import_users(db, bulk._read_records(io.StringIO(CSV.format(hash="")), "csv"), pool)
+    finally:
+        db.close()
+    return report, again
+
+
+def login(client, email, password="Passw0rdX"):
+    r = client.post("/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_import_report(imported):
+    report, again = imported
+    assert (report.users, report.profiles) == (4, 2)
+    assert report.duplicates == ["partial@example.com"]
+    assert report.invalid == [6, 7, 8]
+    assert again.users == 0
+    assert sorted(again.duplicates) == sorted(
+        ["partial@example.com", "full@example.com", "noprofile@example.com", "partial@example.com"]
+    )
+
+
+def test_partial_profile_user_can_use_the_api(client, imported):
+    headers = login(client, "partial@example.com")
+    profile = client.get("/profile/partial@example.com", headers=headers).json()
+    assert (profile["name"], profile["age_group"], profile["language_pref"], profile["bio"]) == (
+        "Partial", "18-25", "", ""
+    )
+    assert client.get("/readability/summary", headers=headers).status_code == 200
+    form = {"name": "Partial", "age_group": "18-25", "language_pref": "English", "bio": "Fixed"}
+    assert client.post("/profile", data=form, headers=headers).status_code == 200
+
+
+def test_imported_hash_and_missing_profile(client, imported):
+    headers = login(client, "hashed@example.com", "Hashed1X")
+    assert client.get("/profile/hashed@example.com", headers=headers).status_code == 404
+    headers = login(client, "noprofile@example.com")
+    assert client.get("/profile/noprofile@example.com", headers=headers).status_code == 404
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_export(imported, fmt):
+    out = io.StringIO()
+    db = database.SessionLocal()
+    try:
+        count = bulk.export_users(db, out, fmt, include_hashes=(fmt == "jsonl"))
+        total = db.query(models.User).count()
+    finally:
+        db.close()
+    assert count == total
+    out.seek(0)
+    rows = {r["email"]: r for r in bulk._read_records(out, fmt)}
+    assert rows["full@example.com"]["language_pref"] == "German"
+    assert ("password_hash" in rows["full@example.com"]) == (fmt == "jsonl")
+    if fmt == "jsonl":
+        assert auth.pwd_context.verify("Passw0rdX", rows["full@example.com"]["password_hash"])
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from backend import cache
+from backend.cache import TextFingerprint, TTLCache
+
+TEXT = "Cached text is scored once. Then it is served from the cache."
+
+
+def fingerprint(*chunks):
+    fp = TextFingerprint()
+    for chunk in chunks:
+        fp.update(chunk)
+    return fp.hexdigest()
+
+
+def test_fingerprint_ignores_whitespace_layout_and_chunking():
+    assert fingerprint("one two.  three") == fingerprint("  one\ttwo.\n\n", "three ")
+    assert fingerprint("one two") == fingerprint("one", " ", "two")
+    assert fingerprint("one two") != fingerprint("onetwo")
+    # chunks are pieces of one text, not separate words
+    assert fingerprint("one", "two") == fingerprint("onetwo")
+    # results from another algorithm version are never matched
+    assert TextFingerprint(version="1").hexdigest() != TextFingerprint(version="2").hexdigest()
+
+
+def test_ttl_cache_expires_and_evicts():
+    c = TTLCache("test-ttl", maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2, ttl=0.01)
+    time.sleep(0.02)
+    assert c.get("a") == 1
+    assert c.get("b") is None
+    c.set("c", 3)
+    c.set("d", 4)
+    assert c.get("a") is None
+    assert c.info()["evictions"] == 1
+
+
+def test_memory_tier_hit(client, expected):
+    r = client.post("/readability", data={"text": TEXT})
+    assert r.headers["X-Cache"] == "MISS"
+    # whitespace differences share the cached result
+    r = client.post("/readability", data={"text": "  " + TEXT.replace(" ", "\n")})
+    assert r.headers["X-Cache"] == "HIT"
+    assert r.headers["X-Cache-Tier"] == "memory"
+    assert r.json() == expected(TEXT)
+
+
+def test_database_tier_hit(client, expected, monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "READABILITY_CACHE_DB", True)
+    text = "The database tier survives a restart. It is slower than memory."
+    assert client.post("/readability", data={"text": text}).headers["X-Cache"] == "MISS"
+    # as after a restart: only the database still has the result
+    cache.readability_results.clear()
+    r = client.post("/readability", data={"text": text})
+    assert (r.headers["X-Cache"], r.headers["X-Cache-Tier"]) == ("HIT", "db")
+    assert r.json() == expected(text)
+    assert client.post("/readability", data={"text": text}).headers["X-Cache-Tier"] == "memory"
+
+
+def test_concurrent_stores_of_one_key(client):
+    errors = []
+
+    def store(key, barrier):
+        barrier.wait()
+        try:
+            cache.store_readability(key, {"words": 1})
+        except Exception as e:
+            errors.append(e)
+
+    for round_ in range(20):
+        barrier = threading.Barrier(4)
+        threads = [threading.Thread(target=store, args=(f"race-{round_}", barrier)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert errors == []
+    assert cache.load_readability("race-0") == {"words": 1}
+
+
+def test_stream_stores_result_in_database_tier(client, monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "READABILITY_CACHE_DB", True)
+    text = "Streamed results reach the database tier. They are written after the response."
+    with client.stream("POST", "/readability/stream", data={"text": text}) as r:
+        result = [line for line in r.iter_lines() if line][-1]
+    assert '"result"' in result
+    assert cache.load_readability(fingerprint(text))["words"] == 12
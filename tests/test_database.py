@@ -0,0 +1,106 @@
+import itertools
+import threading
+
+import pytest
+from sqlalchemy import exc, func, select
+
+from backend import database, models
+
+pytestmark = pytest.mark.skipif(
+    not database.IS_SQLITE or database.SQLITE_MEMORY, reason="needs the SQLite file profile"
+)
+
+_emails = (f"db-{i}@example.com" for i in itertools.count())
+
+
+@pytest.fixture(autouse=True)
+def tables():
+    models.Base.metadata.create_all(bind=database.engine)
+
+
+def user_count(session):
+    return session.scalar(select(func.count()).select_from(models.User))
+
+
+def test_pragmas_are_applied():
+    with database.engine.connect() as conn:
+        pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()  # noqa: E731
+        assert pragma("journal_mode") == "wal"
+        assert pragma("foreign_keys") == 1
+        assert pragma("busy_timeout") == database.SQLITE_BUSY_TIMEOUT_MS
+
+
+def test_write_after_read_survives_a_concurrent_commit():
+    # A reads, B commits a write, then A writes: upgrading A's read
+    # transaction in place would fail with "database is locked"
+    a, b = database.SessionLocal(), database.SessionLocal()
+    try:
+        before = user_count(a)
+        b.add(models.User(name="b", email=next(_emails), password_hash="x"))
+        b.commit()
+        a.add(models.User(name="a", email=next(_emails), password_hash="x"))
+        a.commit()
+        assert user_count(a) == before + 2
+    finally:
+        a.close()
+        b.close()
+
+
+def test_reads_do_not_wait_for_a_writer():
+    writer, reader = database.SessionLocal(), database.SessionLocal()
+    try:
+        committed = user_count(reader)
+        reader.commit()
+        writer.add(models.User(name="w", email=next(_emails), password_hash="x"))
+        writer.flush()  # holds the write lock
+        assert user_count(reader) == committed
+        writer.rollback()
+        assert user_count(writer) == committed
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_concurrent_read_then_write_transactions():
+    sessions = 8
+    barrier = threading.Barrier(sessions)
+    errors = []
+    start = user_count(database.SessionLocal())
+
+    def work():
+        session = database.SessionLocal()
+        try:
+            user_count(session)
+            barrier.wait()
+            for _ in range(5):
+                session.add(models.User(name="t", email=next(_emails), password_hash="x"))
+                session.commit()
+                user_count(session)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=work) for _ in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert user_count(database.SessionLocal()) == start + sessions * 5
+
+
+def test_foreign_keys_are_enforced():
+    session = database.SessionLocal()
+    try:
+        session.add(models.Profile(name="orphan", user_id=10**9))
+        with pytest.raises(exc.IntegrityError):
+            session.commit()
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_pool_endpoint(client):
+    stats = client.get("/db/pool").json()
+    assert stats["sync"]["checkouts"] > 0
@@ -0,0 +1,116 @@
+import itertools
+import threading
+
+import pytest
+
+from backend import crud, database
+
+_users = itertools.count()
+
+
+@pytest.fixture
+def user(client):
+    """A fresh user with an empty history: (id, auth headers)."""
+    email = f"history-{next(_users)}@example.com"
+    client.post("/register", json={"email": email, "name": "History", "password": "Passw0rdX"})
+    token = client.post("/login", json={"email": email, "password": "Passw0rdX"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    return _user_id(email), headers
+
+
+def _user_id(email):
+    db = database.SessionLocal()
+    try:
+        return crud.get_user_by_email(db, email).id
+    finally:
+        db.close()
+
+
+def history(client, headers, **params):
+    return client.get("/readability/history", params=params, headers=headers).json()
+
+
+def test_every_scoring_path_is_recorded(client, user):
+    _, headers = user
+    assert client.get("/readability/summary", headers=headers).json()["count"] == 0
+    client.post("/readability", data={"text": "Plain scoring is recorded."}, headers=headers)
+    # a cache hit is recorded too
+    client.post("/readability", data={"text": "Plain scoring is recorded."}, headers=headers)
+    with client.stream("POST", "/readability/stream", data={"text": "Streams are recorded."}, headers=headers) as r:
+        list(r.iter_lines())
+    client.post("/readability/sessions", data={"text": "Sessions are recorded."}, headers=headers)
+    # anonymous analyses are not
+    client.post("/readability", data={"text": "Nobody's analysis."})
+
+    items = history(client, headers)["items"]
+    assert len(items) == 4
+    assert client.get("/readability/summary", headers=headers).json()["count"] == 4
+
+
+def test_summary_matches_history(client, user):
+    _, headers = user
+    texts = [
+        "Short. Simple. Easy.",
+        "Extraordinarily complicated institutional considerations necessitate deliberation.",
+        "A middling sentence with a few longer words in it, for variety.",
+    ]
+    for text in texts:
+        client.post("/readability", data={"text": text}, headers=headers)
+    items = history(client, headers)["items"]
+    summary = client.get("/readability/summary", headers=headers).json()
+    assert summary["count"] == len(texts)
+    for key in ("flesch_kincaid_re", "gunning_fog", "smog"):
+        assert summary[f"mean_{key}"] == round(sum(i[key] for i in items) / len(items), 2)
+    levels = {name: sum(1 for i in items if i["level"] == name) for name in summary["levels"]}
+    assert summary["levels"] == levels
+
+
+def test_history_is_paged_newest_first(client, user):
+    user_id, headers = user
+    scores = {"flesch_kincaid_re": 80.0, "gunning_fog": 5.0, "smog": 6.0, "sentences": 1,
+              "words": 3, "syllables": 4, "complex_words": 0, "level": "Beginner"}
+    db = database.SessionLocal()
+    try:
+        for i in range(5):
+            crud.record_analysis(db, user_id, f"key-{i}", scores)
+    finally:
+        db.close()
+    first = history(client, headers, limit=2)
+    ids = [i["id"] for i in first["items"]]
+    assert ids == sorted(ids, reverse=True) and first["next_before"] == ids[-1]
+    pages = [ids]
+    page = first
+    while page["next_before"] is not None:
+        page = history(client, headers, limit=2, before=page["next_before"])
+        pages.append([i["id"] for i in page["items"]])
+    all_ids = [i for p in pages for i in p]
+    assert len(all_ids) == 5 and len(set(all_ids)) == 5
+    assert client.get("/readability/history", params={"limit": 0}, headers=headers).status_code == 422
+
+
+def test_concurrent_analyses_never_lose_a_count(client, user):
+    user_id, headers = user
+    scores = {"flesch_kincaid_re": 40.0, "gunning_fog": 12.0, "smog": 11.0, "sentences": 1,
+              "words": 3, "syllables": 9, "complex_words": 2, "level": "Advanced"}
+    barrier = threading.Barrier(6)
+    errors = []
+
+    def record(i):
+        db = database.SessionLocal()
+        try:
+            barrier.wait()
+            crud.record_analysis(db, user_id, f"race-{i}", scores)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=record, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    summary = client.get("/readability/summary", headers=headers).json()
+    assert summary["count"] == 6
+    assert summary["levels"]["Advanced"] == 6
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, update
+
+from backend import database, jobs, models
+
+TEXT = "The cat sat on the mat. It was an extraordinarily comfortable mat!\n\nThen it left."
+
+
+@pytest.fixture
+def db(client):
+    session = database.SessionLocal()
+    session.execute(delete(models.ReadabilityJob))
+    session.commit()
+    yield session
+    session.close()
+
+
+def expire_lease(db, job_id):
+    db.execute(
+        update(models.ReadabilityJob)
+        .where(models.ReadabilityJob.id == job_id)
+        .values(lease_expires=datetime.utcnow() - timedelta(seconds=1))
+    )
+    db.commit()
+
+
+def stored_text(db, job_id):
+    db.expire_all()
+    return db.get(models.ReadabilityJob, job_id).text
+
+
+def test_job_round_trip(client, db, expected):
+    r = client.post("/readability/jobs", data={"text": TEXT})
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+    r = client.get(f"/readability/jobs/{job_id}")
+    assert r.json()["status"] == jobs.QUEUED
+    assert r.headers["Retry-After"] == "1"
+
+    # job workers are disabled in tests; process the job in-line
+    assert jobs.claim(db, "test") == job_id
+    assert jobs.process(db, job_id, "test")
+    assert stored_text(db, job_id) == ""
+    job = client.get(f"/readability/jobs/{job_id}").json()
+    assert job["status"] == jobs.DONE
+    assert job["result"] == expected(TEXT)
+    assert client.get("/readability/jobs/missing").status_code == 404
+
+
+def test_a_job_is_claimed_once(db):
+    job_id = jobs.enqueue(db, TEXT)
+    assert jobs.claim(db, "a") == job_id
+    assert jobs.claim(db, "b") is None
+    # a worker that lost its lease cannot finish the job
+    expire_lease(db, job_id)
+    assert jobs.claim(db, "b") == job_id
+    assert not jobs.complete(db, job_id, "a", {})
+    assert jobs.complete(db, job_id, "b", {"words": 1})
+
+
+def test_failures_are_retried_up_to_max_attempts(db):
+    job_id = jobs.enqueue(db, TEXT)
+    for attempt in range(1, jobs.JOB_MAX_ATTEMPTS + 1):
+        assert jobs.claim(db, "w") == job_id
+        assert jobs.fail(db, job_id, "w", "boom", attempt)
+    job = jobs.get_job(db, job_id)
+    assert (job["status"], job["error"], job["attempts"]) == (jobs.FAILED, "boom", jobs.JOB_MAX_ATTEMPTS)
+    assert stored_text(db, job_id) == ""
+    assert jobs.claim(db, "w") is None
+
+
+def test_a_job_that_keeps_killing_its_worker_is_failed(db):
+    job_id = jobs.enqueue(db, TEXT)
+    # each worker dies mid-job: its lease just runs out, fail() is never called
+    for _ in range(jobs.JOB_MAX_ATTEMPTS):
+        assert jobs.claim(db, "doomed") == job_id
+        expire_lease(db, job_id)
+    assert jobs.claim(db, "next") is None
+    job = jobs.get_job(db, job_id)
+    assert job["status"] == jobs.FAILED
+    assert job["attempts"] == jobs.JOB_MAX_ATTEMPTS
+    assert "attempts" in job["error"]
+    assert stored_text(db, job_id) == ""
+
+
+def test_empty_text_fails_at_once(db):
+    job_id = jobs.enqueue(db, "   ")
+    assert jobs.claim(db, "w") == job_id
+    jobs.process(db, job_id, "w")
+    assert jobs.get_job(db, job_id)["status"] == jobs.FAILED
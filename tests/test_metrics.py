@@ -0,0 +1,41 @@
+import re
+
+
+def sample(client, name, **labels):
+    """Current value of one metric sample, 0 if it has not been recorded yet."""
+    text = client.get("/metrics").text
+    label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    m = re.search(rf"^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$", text, re.M)
+    return float(m.group(1)) if m else 0.0
+
+
+def test_routes_are_labelled_by_template(client):
+    before = sample(client, "http_requests_total", method="GET", route="/readability/jobs/{job_id}", status="404")
+    client.get("/readability/jobs/does-not-exist")
+    client.get("/readability/jobs/also-missing")
+    after = sample(client, "http_requests_total", method="GET", route="/readability/jobs/{job_id}", status="404")
+    assert after == before + 2
+    assert sample(client, "http_request_duration_seconds_count", method="GET", route="/readability/jobs/{job_id}") > 0
+
+
+def test_analysis_phases_are_recorded_on_every_scoring_path(client):
+    def scored():
+        return sample(client, "readability_phase_duration_seconds_count", phase="score")
+
+    count = scored()
+    client.post("/readability", data={"text": "A fresh text for the metrics test."})
+    assert scored() == count + 1
+    client.post("/readability/batch", json=["One metrics text.", "Another metrics text."])
+    assert scored() == count + 2
+    client.post("/readability/sessions", data={"text": "Session text for metrics."})
+    assert scored() == count + 3
+
+
+def test_db_queries_are_timed(client):
+    client.get("/readability/jobs/missing-again")
+    assert sample(client, "db_query_duration_seconds_count", operation="SELECT") > 0
+
+
+def test_cache_stats(client):
+    stats = client.get("/cache/stats").json()
+    assert {"readability", "tokens", "syllables"} <= set(stats)
@@ -0,0 +1,60 @@
+import pytest
+
+FORM = {"name": "Reader", "age_group": "18-25", "language_pref": "English", "bio": "Hi"}
+
+
+@pytest.fixture
+def profile_owner(client):
+    """A user of their own, so profile state does not leak between tests."""
+    user = {"email": "profile-owner@example.com", "name": "Owner", "password": "Passw0rdX"}
+    # registered by the first test that uses it
+    client.post("/register", json=user)
+    token = client.post("/login", json={"email": user["email"], "password": user["password"]}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    yield user["email"], headers
+    client.delete(f"/profile/{user['email']}", headers=headers)
+
+
+def test_profile_round_trip(client, profile_owner):
+    email, headers = profile_owner
+    assert client.get(f"/profile/{email}", headers=headers).status_code == 404
+    r = client.post("/profile", data=FORM, headers=headers)
+    assert r.status_code == 200, r.text
+    assert client.get(f"/profile/{email}", headers=headers).json()["bio"] == "Hi"
+
+    # the cached profile is replaced on update
+    assert client.post("/profile", data={**FORM, "bio": "Updated"}, headers=headers).status_code == 200
+    assert client.get(f"/profile/{email}", headers=headers).json()["bio"] == "Updated"
+
+    assert client.delete(f"/profile/{email}", headers=headers).status_code == 200
+    assert client.get(f"/profile/{email}", headers=headers).status_code == 404
+    assert client.delete(f"/profile/{email}", headers=headers).status_code == 404
+
+
+def test_profile_reads_are_cached(client, profile_owner):
+    from backend.main import profile_cache
+
+    email, headers = profile_owner
+    client.post("/profile", data=FORM, headers=headers)
+    client.get(f"/profile/{email}", headers=headers)
+    hits = profile_cache.hits
+    assert client.get(f"/profile/{email}", headers=headers).json()["bio"] == "Hi"
+    assert profile_cache.hits == hits + 1
+
+
+def test_stale_read_does_not_repopulate_the_cache():
+    from backend import main
+
+    # a read that started before a write finished must not be cached
+    writes = main._profile_writes
+    main.invalidate_profile(12345)
+    main._cache_profile(12345, "stale", writes)
+    assert main.profile_cache.get(12345) is None
+
+
+def test_profile_access_is_limited_to_its_owner(client, auth, profile_owner):
+    email, _ = profile_owner
+    assert client.get(f"/profile/{email}", headers=auth).status_code == 403
+    assert client.delete(f"/profile/{email}", headers=auth).status_code == 403
+    assert client.post("/profile", data={**FORM, "email": email}, headers=auth).status_code == 403
+    assert client.get(f"/profile/{email}").status_code == 401
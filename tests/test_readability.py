@@ -0,0 +1,37 @@
+import io
+
+TEXT = "The cat sat on the mat. It was an extraordinarily comfortable mat!\n\nThen it left."
+
+
+def test_readability_text_and_file(client, expected):
+    r = client.post("/readability", data={"text": TEXT})
+    assert r.status_code == 200
+    assert r.json() == expected(TEXT)
+
+    files = {"file": ("doc.txt", io.BytesIO(TEXT.encode()), "text/plain")}
+    assert client.post("/readability", files=files).json() == expected(TEXT)
+
+
+def test_readability_streams_large_upload_in_chunks(client, expected, monkeypatch):
+    from backend import main
+
+    # chunk boundaries fall inside words and sentences
+    monkeypatch.setattr(main, "READ_CHUNK_SIZE", 7)
+    text = "Sentence number one is here. Another extraordinary sentence! " * 50 + "ünïcödé words."
+    files = {"file": ("big.txt", io.BytesIO(text.encode()), "text/plain")}
+    assert client.post("/readability", files=files).json() == expected(text)
+
+
+def test_readability_rejects_bad_input(client):
+    assert client.post("/readability").status_code == 400
+    assert client.post("/readability", data={"text": "   "}).status_code == 400
+    files = {"file": ("doc.pdf", io.BytesIO(b"%PDF"), "application/pdf")}
+    assert client.post("/readability", files=files).status_code == 415
+
+
+def test_readability_rejects_oversized_upload(client, monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 100)
+    files = {"file": ("big.txt", io.BytesIO(b"word " * 100), "text/plain")}
+    assert client.post("/readability", files=files).status_code == 413
@@ -0,0 +1,71 @@
+import random
+import re
+
+import pytest
+
+from backend.analysis import readability_level, readability_profile, readability_scores
+
+WORDS = ["the", "readability", "of", "it's", "extraordinary", "text", "cat", "naïve"]
+KEYS = ("flesch_kincaid_re", "gunning_fog", "smog")
+
+
+def document(rng, paragraphs):
+    out = []
+    for _ in range(paragraphs):
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 10))) + rng.choice([".", "!", "?", "..."])
+            for _ in range(rng.randint(1, 5))
+        ]
+        out.append(" ".join(sentences))
+    return "\n\n".join(out)
+
+
+def sentence_spans(text):
+    return [m.span() for m in re.finditer(r"[^.!?]+", text) if m.group().strip()]
+
+
+def column_rows(columns, n):
+    return [{k: columns[k][i] for k in (*KEYS, "level")} for i in range(n)]
+
+
+def scored(text):
+    scores = readability_scores(text)
+    return {**{k: scores[k] for k in KEYS}, "level": readability_level(scores["flesch_kincaid_re"])}
+
+
+def check_profile(text, profile):
+    spans = sentence_spans(text)
+    window, step = profile["window"], profile["step"]
+    assert profile["sentences"] == len(spans)
+    starts = profile["windows"]["start"]
+    assert starts == list(range(0, max(len(spans) - window, 0) + 1, step))
+    for start, got in zip(starts, column_rows(profile["windows"], len(starts))):
+        end = min(start + window, len(spans))
+        assert got == scored(text[spans[start][0]:spans[end - 1][1]]), (start, window)
+
+    paragraphs = [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+    got = column_rows(profile["paragraphs"], len(profile["paragraphs"]["sentences"]))
+    assert got == [scored(p) for p in paragraphs]
+    assert profile["paragraphs"]["sentences"] == [readability_scores(p)["sentences"] for p in paragraphs]
+
+
+@pytest.mark.parametrize("window,step", [(1, 1), (3, 1), (5, 2), (50, 1)])
+def test_profile_matches_scores_of_each_slice(window, step):
+    pytest.importorskip("numpy")
+    rng = random.Random(window * 10 + step)
+    for _ in range(20):
+        text = document(rng, rng.randint(1, 5))
+        check_profile(text, readability_profile(text, window, step))
+
+
+def test_profile_endpoint(client):
+    text = document(random.Random(3), 4)
+    r = client.post("/readability/profile", data={"text": text, "window": 2})
+    assert r.status_code == 200, r.text
+    check_profile(text, r.json())
+
+
+def test_profile_endpoint_rejects_bad_parameters(client):
+    assert client.post("/readability/profile", data={"text": "One. Two.", "window": 0}).status_code == 422
+    assert client.post("/readability/profile", data={"text": "One. Two.", "step": 0}).status_code == 422
+    assert client.post("/readability/profile", data={"text": "  "}).status_code == 400
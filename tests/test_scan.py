@@ -0,0 +1,89 @@
+import csv
+import os
+
+import pytest
+
+from backend import scan
+from backend.analysis import readability_level, readability_scores
+
+DOCS = {
+    "a.txt": "The cat sat on the mat. It was comfortable!",
+    "sub/b.txt": "Naïve café owners serve crème brûlée. Extraordinary! " * 30,
+    "sub/deeper/c.txt": "One more readable document. Short sentences help.",
+    "notes.md": "Not matched by the pattern.",
+}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "docs"
+    for rel_path, text in DOCS.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    (root / "empty.txt").write_bytes(b"  \n")
+    return root
+
+
+def expected_row(text):
+    scores = readability_scores(text)
+    return {**scores, "level": readability_level(scores["flesch_kincaid_re"])}
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_score_file_matches_whole_text_scoring(tree, monkeypatch):
+    # chunk boundaries split multi-byte characters
+    monkeypatch.setattr(scan, "CHUNK_BYTES", 7)
+    row = scan.score_file(str(tree), "sub/b.txt")
+    assert {k: row[k] for k in expected_row(DOCS["sub/b.txt"])} == expected_row(DOCS["sub/b.txt"])
+    assert row["bytes"] == len(DOCS["sub/b.txt"].encode())
+    assert scan.score_file(str(tree), "empty.txt")["error"] == "Empty text"
+    assert "error" in scan.score_file(str(tree), "missing.txt")
+
+
+def test_scan_writes_csv_and_resumes_from_checkpoint(tree, tmp_path):
+    output = str(tmp_path / "out.csv")
+    assert scan.scan(str(tree), output, workers=2, files_per_task=1, flush_every=2) == 4
+    rows = {row["path"]: row for row in read_rows(output)}
+    assert sorted(rows) == ["a.txt", "empty.txt", "sub/b.txt", "sub/deeper/c.txt"]
+    assert float(rows["a.txt"]["flesch_kincaid_re"]) == expected_row(DOCS["a.txt"])["flesch_kincaid_re"]
+    assert rows["empty.txt"]["error"] == "Empty text"
+
+    # a rerun skips everything already checkpointed
+    assert scan.scan(str(tree), output, workers=2) == 0
+    assert len(read_rows(output)) == 4
+
+    # new files are picked up, and only they are scored
+    (tree / "sub" / "new.txt").write_text("A late arrival.", encoding="utf-8")
+    assert scan.scan(str(tree), output, workers=2) == 1
+    assert [row["path"] for row in read_rows(output)].count("sub/new.txt") == 1
+    assert len(read_rows(output)) == 5
+
+
+def test_scan_skips_paths_in_an_interrupted_checkpoint(tree, tmp_path):
+    output = str(tmp_path / "out.csv")
+    # as left by a run interrupted after its first flush
+    with open(output + ".checkpoint", "w", encoding="utf-8") as f:
+        f.write("a.txt\nsub/b.txt\n")
+    assert scan.scan(str(tree), output, workers=1) == 2
+    assert sorted(row["path"] for row in read_rows(output)) == ["empty.txt", "sub/deeper/c.txt"]
+
+
+def test_parquet_output_needs_pyarrow(tree, tmp_path):
+    output = str(tmp_path / "out.parquet")
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        # fails before any file is scored or checkpointed
+        with pytest.raises(ImportError):
+            scan.scan(str(tree), output, workers=1)
+        assert not os.path.exists(output + ".checkpoint")
+        return
+    pd = pytest.importorskip("pandas")
+    assert scan.scan(str(tree), output, workers=2, flush_every=2) == 4
+    frame = pd.read_parquet(output)
+    assert sorted(frame["path"]) == ["a.txt", "empty.txt", "sub/b.txt", "sub/deeper/c.txt"]
@@ -0,0 +1,71 @@
+from backend.analysis import IncrementalReadability
+from backend.workers import BoundedProcessPool
+
+TEXT = "The cat sat on the mat. It was an extraordinarily comfortable mat!\n\nThen it left."
+
+
+class RecordingPool(BoundedProcessPool):
+    def __init__(self):
+        super().__init__(workers=1, max_pending=4)
+        self.calls = 0
+
+    async def run(self, fn, *args):
+        self.calls += 1
+        return await super().run(fn, *args)
+
+
+def test_session_updates_recount_changed_paragraphs(client, expected):
+    r = client.post("/readability/sessions", data={"text": TEXT})
+    assert r.status_code == 200
+    session = r.json()
+    assert session["paragraphs_recounted"] == 2
+
+    edited = TEXT.replace("Then it left.", "Then it left the room.")
+    body = client.put(f"/readability/sessions/{session['session_id']}", data={"text": edited}).json()
+    assert body["paragraphs_recounted"] == 1
+    assert {k: body[k] for k in expected(edited)} == expected(edited)
+
+    assert client.delete(f"/readability/sessions/{session['session_id']}").status_code == 200
+    r = client.put(f"/readability/sessions/{session['session_id']}", data={"text": edited})
+    assert r.status_code == 404
+
+
+def test_session_rejects_empty_text(client):
+    assert client.post("/readability/sessions", data={"text": " \n\n "}).status_code == 400
+    session_id = client.post("/readability/sessions", data={"text": TEXT}).json()["session_id"]
+    assert client.put(f"/readability/sessions/{session_id}", data={"text": ""}).status_code == 400
+    assert client.put(f"/readability/sessions/{session_id}").status_code == 400
+
+
+def test_uncounted_chars():
+    handle = IncrementalReadability()
+    assert handle.uncounted_chars(TEXT) == len(TEXT) - 2
+    handle.update(TEXT)
+    assert handle.uncounted_chars(TEXT) == 0
+    assert handle.uncounted_chars(TEXT + "\n\nNew one.") == len("New one.")
+
+
+def test_large_rewrites_go_to_the_pool(client, monkeypatch, expected):
+    from backend import main
+
+    pool = RecordingPool()
+    monkeypatch.setattr(main, "scoring_pool", pool)
+    monkeypatch.setattr(main, "INLINE_MAX_CHARS", 200)
+    try:
+        session_id = client.post("/readability/sessions", data={"text": TEXT}).json()["session_id"]
+        assert pool.calls == 0
+
+        # one large new paragraph: scored in the pool, whatever the session's age
+        rewritten = TEXT + "\n\n" + "A much longer paragraph. " * 20
+        body = client.put(f"/readability/sessions/{session_id}", data={"text": rewritten}).json()
+        assert pool.calls == 1
+        assert {k: body[k] for k in expected(rewritten)} == expected(rewritten)
+
+        # a small edit to a large document stays inline
+        edited = rewritten.replace("Then it left.", "Then it left again.")
+        body = client.put(f"/readability/sessions/{session_id}", data={"text": edited}).json()
+        assert pool.calls == 1
+        assert body["paragraphs_recounted"] == 1
+        assert {k: body[k] for k in expected(edited)} == expected(edited)
+    finally:
+        pool.shutdown()
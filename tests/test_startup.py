@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_ready_after_warm_up(client):
+    assert client.get("/").status_code == 200
+    # warm-up runs in the background after startup
+    deadline = time.monotonic() + 30
+    while (r := client.get("/ready")).status_code != 200 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert r.status_code == 200, r.text
+    assert r.json()["ready"] is True
+
+
+def test_shutdown_during_warm_up_exits_cleanly(tmp_path):
+    # stopping before warm-up finishes used to abort the interpreter while the
+    # bcrypt self-test was still running in a thread
+    script = textwrap.dedent("""
+        from fastapi.testclient import TestClient
+        from backend.main import app
+
+        with TestClient(app) as c:
+            c.get("/")
+    """)
+    env = {
+        **os.environ,
+        "DATABASE_URL": "sqlite://",
+        "UPLOAD_DIR": str(tmp_path / "uploads"),
+        "PYTHONPATH": ROOT,
+    }
+    for _ in range(3):
+        result = subprocess.run([sys.executable, "-c", script], env=env, cwd=ROOT, capture_output=True, timeout=120)
+        assert result.returncode == 0, result.stderr.decode()[-2000:]
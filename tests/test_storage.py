@@ -0,0 +1,126 @@
+import io
+import os
+import time
+
+import pytest
+
+from backend import database, models, storage
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "_TMP_DIR", str(tmp_path / ".tmp"))
+    return tmp_path
+
+
+def stored_files(root):
+    return sorted(
+        os.path.relpath(os.path.join(d, name), root).replace(os.sep, "/")
+        for d, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def test_identical_images_are_stored_once(upload_dir):
+    first = storage.store_image(io.BytesIO(b"image bytes"), "me.JPEG")
+    assert first.endswith(".jpg") and first[:2] == os.path.basename(first)[:2]
+    path = upload_dir / first
+    old = time.time() - 7200
+    os.utime(path, (old, old))
+
+    assert storage.store_image(io.BytesIO(b"image bytes"), "copy.jpg") == first
+    assert stored_files(upload_dir) == [first]
+    # the reused file counts as new again, so gc leaves it alone for now
+    assert os.path.getmtime(path) > old + 3600
+    assert storage.store_image(io.BytesIO(b"other bytes"), "other.jpg") != first
+
+
+def test_rejected_uploads_leave_nothing_behind(upload_dir, monkeypatch):
+    with pytest.raises(storage.UnsupportedImage):
+        storage.store_image(io.BytesIO(b"x"), "notes.txt")
+    monkeypatch.setattr(storage, "PROFILE_PIC_MAX_BYTES", 10)
+    monkeypatch.setattr(storage, "CHUNK_SIZE", 4)
+    with pytest.raises(storage.UploadTooLarge):
+        storage.store_image(io.BytesIO(b"x" * 11), "big.png")
+    assert stored_files(upload_dir) == []
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(bind=database.engine)
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+def test_gc_removes_only_unreferenced_old_files(upload_dir, db):
+    kept = storage.store_image(io.BytesIO(b"referenced"), "a.png")
+    stem = os.path.splitext(kept)[0]
+    derivative = f"{stem}.200.webp"
+    (upload_dir / derivative).write_bytes(b"thumb")
+    orphan = storage.store_image(io.BytesIO(b"orphan"), "b.png")
+    user = models.User(name="gc", email="gc@example.com", password_hash="x")
+    user.profile = models.Profile(name="gc", profile_pic=f"http://testserver/uploads/{kept}")
+    db.add(user)
+    db.commit()
+    try:
+        # everything is too new to be collected
+        assert storage.collect_garbage(db, min_age=3600) == []
+
+        assert storage.collect_garbage(db, min_age=0, dry_run=True) == [orphan]
+        assert orphan in stored_files(upload_dir)
+
+        assert storage.collect_garbage(db, min_age=0) == [orphan]
+        assert stored_files(upload_dir) == sorted([kept, derivative])
+    finally:
+        db.delete(user.profile)
+        db.delete(user)
+        db.commit()
+
+
+def png_bytes(size=(400, 300)):
+    Image = pytest.importorskip("PIL.Image")
+    buf = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def test_derivatives_are_generated_once(upload_dir):
+    Image = pytest.importorskip("PIL.Image")
+    rel_path = storage.store_image(io.BytesIO(png_bytes()), "pic.png")
+    derivatives = storage.generate_derivatives(rel_path)
+    assert set(derivatives) == set(storage.DERIVATIVE_SIZES)
+    for name, path in derivatives.items():
+        with Image.open(upload_dir / path) as thumb:
+            assert thumb.format == "WEBP"
+            assert max(thumb.size) == storage.DERIVATIVE_SIZES[name]
+    assert storage.generate_derivatives(rel_path) == derivatives
+    # unreadable images get no derivatives instead of an error
+    broken = storage.store_image(io.BytesIO(b"not a png"), "broken.png")
+    assert storage.generate_derivatives(broken) == {}
+
+
+def test_uploaded_picture_is_served_with_strong_caching(client):
+    user = {"email": "pictures@example.com", "name": "Pic", "password": "Passw0rdX"}
+    client.post("/register", json=user)
+    token = client.post("/login", json={"email": user["email"], "password": user["password"]}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    form = {"name": "Pic", "age_group": "18-25", "language_pref": "English", "bio": "Pictures"}
+    files = {"profile_pic": ("me.png", io.BytesIO(png_bytes()), "image/png")}
+    try:
+        assert client.post("/profile", data=form, files=files, headers=headers).status_code == 200
+        # thumbnails are recorded by a background task that ran after the response
+        profile = client.get(f"/profile/{user['email']}", headers=headers).json()
+        assert set(profile["profile_pic_variants"]) == set(storage.DERIVATIVE_SIZES)
+
+        url = profile["profile_pic_variants"]["thumb"].replace("http://testserver", "")
+        r = client.get(url)
+        assert r.status_code == 200
+        assert r.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert client.get(url, headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+
+        bad = {"profile_pic": ("me.bmp", io.BytesIO(b"BM"), "image/bmp")}
+        assert client.post("/profile", data=form, files=bad, headers=headers).status_code == 415
+    finally:
+        client.delete(f"/profile/{user['email']}", headers=headers)
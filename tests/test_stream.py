@@ -0,0 +1,50 @@
+import io
+import json
+
+TEXT = "The cat sat on the mat. It was an extraordinarily comfortable mat!\n\nThen it left."
+
+
+def events(client, **kwargs):
+    with client.stream("POST", "/readability/stream", **kwargs) as r:
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in r.iter_lines() if line]
+
+
+def test_stream_reports_progress_then_result(client, expected, monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "READ_CHUNK_SIZE", 20)
+    text = TEXT + " A stream with several chunks."
+    got = events(client, data={"text": text})
+    progress, result = got[:-1], got[-1]
+    assert len(progress) == -(-len(text) // 20)
+    assert [e["done"] for e in progress] == sorted(e["done"] for e in progress)
+    assert progress[-1]["done"] == progress[-1]["total"] == len(text)
+    assert result["event"] == "result"
+    assert {k: result[k] for k in expected(text)} == expected(text)
+
+
+def test_stream_file_upload(client, expected, monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "READ_CHUNK_SIZE", 16)
+    files = {"file": ("doc.txt", io.BytesIO(TEXT.encode()), "text/plain")}
+    got = events(client, files=files)
+    assert got[-2]["done"] == got[-2]["total"] == len(TEXT.encode())
+    assert {k: got[-1][k] for k in expected(TEXT)} == expected(TEXT)
+
+
+def test_stream_cached_text_sends_only_the_result(client):
+    events(client, data={"text": TEXT})
+    got = events(client, data={"text": TEXT})
+    assert [e["event"] for e in got] == ["result"]
+
+
+def test_stream_errors(client):
+    assert client.post("/readability/stream").status_code == 400
+    files = {"file": ("doc.pdf", io.BytesIO(b"%PDF"), "application/pdf")}
+    assert client.post("/readability/stream", files=files).status_code == 415
+    # an upload that turns out to be empty is reported in-stream
+    files = {"file": ("empty.txt", io.BytesIO(b"  \n "), "text/plain")}
+    assert events(client, files=files)[-1] == {"event": "error", "status": 400, "detail": "Empty text"}
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from backend.workers import BoundedProcessPool, PoolBroken, PoolSaturated
+
+
+def test_pool_rejects_calls_over_max_pending():
+    pool = BoundedProcessPool(workers=1, max_pending=1)
+
+    async def scenario():
+        slow = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0)
+        with pytest.raises(PoolSaturated):
+            await pool.run(abs, -1)
+        with pytest.raises(PoolSaturated):
+            await pool.map(abs, [-1])
+        await slow
+        assert pool.pending == 0
+        return await pool.run(abs, -3)
+
+    try:
+        assert asyncio.run(scenario()) == 3
+    finally:
+        pool.shutdown()
+
+
+def test_pool_is_replaced_after_a_worker_dies():
+    pool = BoundedProcessPool(workers=1, max_pending=4)
+
+    async def scenario():
+        with pytest.raises(PoolBroken):
+            await pool.run(os._exit, 1)
+        return await pool.map(abs, [-1, -2])
+
+    try:
+        assert asyncio.run(scenario()) == [1, 2]
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_pool_answers_503(client, monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "scoring_pool", BoundedProcessPool(workers=1, max_pending=0))
+    monkeypatch.setattr(main, "INLINE_MAX_CHARS", 10)
+    r = client.post("/readability", data={"text": "A sentence that is long enough to offload."})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"